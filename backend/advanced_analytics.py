@@ -2,19 +2,121 @@
 Advanced Analytics Service - Comprehensive data analysis and statistics
 """
 
-import sqlite3
+import sys
 import json
+import sqlite3
+import threading
+import orjson
 import csv
 from io import StringIO
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TextIO
+
+# Column statistics are cached per project; oldest entries are evicted first
+STATS_CACHE_SIZE = 256
+
+
+def _load_record(data: str) -> Optional[Dict]:
+    """
+    Parse stored JSON text (orjson, stdlib json as fallback). json_valid
+    also passes text orjson rejects, such as 1e400, integers beyond 64
+    bits or JSON5 on newer SQLite; None means neither parser could read it
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
 
 
 class AdvancedAnalyticsService:
     """Service for comprehensive analytics and statistics"""
     
+    # A json_each cell counts as filled when it is non-null and not blank
+    _FILLED_SQL = "je.type != 'null' AND TRIM(je.value) != ''"
+    
+    # Render cell values the way str() renders the parsed Python value
+    _VALUE_SQL = (
+        "CASE je.type WHEN 'true' THEN 'True' WHEN 'false' THEN 'False' "
+        "ELSE CAST(je.value AS TEXT) END"
+    )
+    
     def __init__(self, db_path: str = "parsehub.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        self._stats_cache = {}  # project_id -> (fingerprint, stats)
+        self._ensure_indexes()
+    
+    def _ensure_indexes(self):
+        """
+        One-time migration so per-project lookups stop scanning scraped_data:
+        index (project_id, created_at) and expose the JSON page number as an
+        indexed virtual generated column
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('PRAGMA table_xinfo(scraped_data)')
+            columns = {row[1] for row in cursor.fetchall()}
+            
+            # Nothing to migrate until scraped_data holds JSON records
+            if 'data' not in columns:
+                return
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scraped_project
+                ON scraped_data(project_id, created_at)
+            ''')
+            
+            if 'page_number_ext' not in columns:
+                cursor.execute('''
+                    ALTER TABLE scraped_data ADD COLUMN page_number_ext INTEGER
+                    GENERATED ALWAYS AS (
+                        CASE WHEN json_valid(data)
+                             THEN CAST(json_extract(data, '$.page_number') AS INTEGER)
+                        END
+                    ) VIRTUAL
+                ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scraped_project_page
+                ON scraped_data(project_id, page_number_ext)
+            ''')
+            
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Could not create analytics indexes: {str(e)}", file=sys.stderr)
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, opened once with WAL and read-tuned
+        PRAGMAs. Reusing it also lets sqlite3's statement cache skip
+        re-preparing the same queries on every call
+        """
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA mmap_size=268435456')
+            conn.execute('PRAGMA cache_size=-65536')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn = conn
+        
+        return conn
+    
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
     
     def get_project_analytics(self, project_id: int) -> Optional[Dict]:
         """
@@ -29,50 +131,45 @@ class AdvancedAnalyticsService:
                 'pagination_status': {...}
             }
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
-        # Get project info
+        # Project, data and run figures in a single round-trip; the last
+        # page is a tail seek on idx_scraped_project_page, not a scan
         cursor.execute('''
-            SELECT id, token, title FROM projects WHERE id = ?
-        ''', (project_id,))
+            WITH data_stats AS (
+                SELECT 
+                    (SELECT COUNT(*) FROM scraped_data
+                     WHERE project_id = :project_id) as total_records,
+                    (SELECT page_number_ext FROM scraped_data
+                     WHERE project_id = :project_id AND page_number_ext IS NOT NULL
+                     ORDER BY page_number_ext DESC LIMIT 1) as last_page
+            ),
+            run_stats AS (
+                SELECT 
+                    COUNT(*) as total_runs,
+                    SUM(CASE WHEN status='complete' THEN 1 ELSE 0 END) as completed_runs,
+                    MAX(end_time) as last_completed
+                FROM runs WHERE project_id = :project_id
+            )
+            SELECT 
+                p.id, p.token, p.title,
+                d.total_records, d.last_page,
+                r.total_runs, r.completed_runs, r.last_completed
+            FROM projects p, data_stats d, run_stats r
+            WHERE p.id = :project_id
+        ''', {'project_id': project_id})
         project = cursor.fetchone()
         
         if not project:
-            conn.close()
             return None
         
-        # Get data stats
-        cursor.execute('''
-            SELECT COUNT(*) as total FROM scraped_data WHERE project_id = ?
-        ''', (project_id,))
-        total_records = cursor.fetchone()['total'] or 0
-        
-        # Get runs info
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_runs,
-                SUM(CASE WHEN status='complete' THEN 1 ELSE 0 END) as completed_runs,
-                MAX(end_time) as last_completed
-            FROM runs WHERE project_id = ?
-        ''', (project_id,))
-        runs_info = cursor.fetchone()
+        total_records = project['total_records'] or 0
+        last_page = project['last_page'] or 1
         
         # Calculate statistics
         stats = self.calculate_statistics(project_id)
         
-        # Get pagination info
-        cursor.execute('''
-            SELECT 
-                MAX(CAST(json_extract(data, '$.page_number') AS INTEGER)) as last_page
-            FROM scraped_data WHERE project_id = ?
-        ''', (project_id,))
-        page_result = cursor.fetchone()
-        last_page = page_result['last_page'] or 1 if page_result else 1
-        
-        conn.close()
-        
         analytics = {
             'project': {
                 'id': project['id'],
@@ -85,9 +182,9 @@ class AdvancedAnalyticsService:
                 'completion_score': self._calculate_completion_score(stats)
             },
             'runs': {
-                'total_runs': runs_info['total_runs'] or 0,
-                'completed_runs': runs_info['completed_runs'] or 0,
-                'last_completed': runs_info['last_completed']
+                'total_runs': project['total_runs'] or 0,
+                'completed_runs': project['completed_runs'] or 0,
+                'last_completed': project['last_completed']
             },
             'data_quality': stats,
             'timestamp': datetime.now().isoformat()
@@ -111,66 +208,114 @@ class AdvancedAnalyticsService:
                 }
             }
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
-        # Get all data for this project
+        # Cheap indexed fingerprint: unchanged row count and newest id mean
+        # the cached statistics are still accurate. Rows are only inserted
+        # and deleted, and AUTOINCREMENT never reuses an id; an in-place
+        # UPDATE of scraped_data.data would not be noticed
         cursor.execute('''
-            SELECT data FROM scraped_data WHERE project_id = ?
-            ORDER BY created_at ASC
+            SELECT COUNT(*) as row_count, MAX(id) as last_id
+            FROM scraped_data WHERE project_id = ?
         ''', (project_id,))
+        fingerprint = tuple(cursor.fetchone())
         
-        raw_data = cursor.fetchall()
-        conn.close()
+        cached = self._stats_cache.get(project_id)
+        if cached and cached[0] == fingerprint:
+            return self._copy_statistics(cached[1])
         
-        if not raw_data:
-            return {}
+        stats = self._compute_statistics(cursor, project_id)
         
-        # Parse JSON data
-        data_list = []
-        for row in raw_data:
-            try:
-                data_list.append(json.loads(row['data']))
-            except:
-                continue
+        self._stats_cache.pop(project_id, None)
+        if len(self._stats_cache) >= STATS_CACHE_SIZE:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self._stats_cache.pop(next(iter(self._stats_cache)))
+        self._stats_cache[project_id] = (fingerprint, stats)
         
-        if not data_list:
+        return self._copy_statistics(stats)
+    
+    @staticmethod
+    def _copy_statistics(stats: Dict) -> Dict:
+        """Copy cached statistics so callers can't modify the cache entry"""
+        return {
+            key: dict(column, sample_values=list(column['sample_values']))
+            for key, column in stats.items()
+        }
+    
+    def _compute_statistics(self, cursor: sqlite3.Cursor, project_id: int) -> Dict:
+        """Aggregate per-column statistics for a project inside SQLite"""
+        # Every column is measured against the number of parseable records
+        cursor.execute('''
+            SELECT COUNT(*) as total FROM scraped_data
+            WHERE project_id = ? AND json_valid(data)
+        ''', (project_id,))
+        total_count = cursor.fetchone()['total'] or 0
+        
+        if not total_count:
             return {}
         
-        # Extract all keys
-        all_keys = set()
-        for item in data_list:
-            if isinstance(item, dict):
-                all_keys.update(item.keys())
+        # Single pass over json_each: collapse cells to distinct values per
+        # column, then derive counts and up to 5 samples with window functions
+        cursor.execute(f'''
+            WITH cells AS (
+                SELECT 
+                    je.key as key,
+                    CASE WHEN {self._FILLED_SQL} THEN {self._VALUE_SQL} END as value,
+                    je.type IN ('object', 'array') as nested
+                FROM scraped_data sd, json_each(sd.data) je
+                WHERE sd.project_id = ? AND json_valid(sd.data) AND json_type(sd.data) = 'object'
+            ),
+            column_values AS (
+                SELECT key, value, MAX(nested) as nested, COUNT(*) as occurrences
+                FROM cells
+                GROUP BY key, value
+            )
+            SELECT key, value, nested, filled_count, unique_count FROM (
+                SELECT 
+                    key,
+                    value,
+                    nested,
+                    SUM(CASE WHEN value IS NOT NULL THEN occurrences ELSE 0 END)
+                        OVER (PARTITION BY key) as filled_count,
+                    COUNT(value) OVER (PARTITION BY key) as unique_count,
+                    ROW_NUMBER() OVER (PARTITION BY key ORDER BY value IS NULL) as rn
+                FROM column_values
+            )
+            WHERE rn <= 5
+            ORDER BY key
+        ''', (project_id,))
+        
+        rows = cursor.fetchall()
         
         # Calculate per-column statistics
         stats = {}
         
-        for key in sorted(all_keys):
-            values = []
-            filled_count = 0
-            unique_values = set()
-            
-            for item in data_list:
-                if isinstance(item, dict):
-                    value = item.get(key)
-                    values.append(value)
-                    
-                    if value is not None and str(value).strip():
-                        filled_count += 1
-                        unique_values.add(str(value))
+        for row in rows:
+            column = stats.get(row['key'])
             
-            completion_pct = (filled_count / len(data_list) * 100) if data_list else 0
+            if column is None:
+                filled_count = row['filled_count']
+                completion_pct = filled_count / total_count * 100
+                
+                column = stats[row['key']] = {
+                    'total_count': total_count,
+                    'filled_count': filled_count,
+                    'empty_count': total_count - filled_count,
+                    'completion_percentage': round(completion_pct, 2),
+                    'unique_count': row['unique_count'],
+                    'sample_values': []
+                }
             
-            stats[key] = {
-                'total_count': len(data_list),
-                'filled_count': filled_count,
-                'empty_count': len(data_list) - filled_count,
-                'completion_percentage': round(completion_pct, 2),
-                'unique_count': len(unique_values),
-                'sample_values': list(unique_values)[:5]
-            }
+            value = row['value']
+            if value is not None:
+                # SQLite renders nested values as JSON text; keep showing
+                # them as str() of the parsed value, as before
+                if row['nested']:
+                    parsed = _load_record(value)
+                    if parsed is not None:
+                        value = str(parsed)
+                column['sample_values'].append(value)
         
         return stats
     
@@ -204,102 +349,114 @@ class AdvancedAnalyticsService:
                           limit: int = 100) -> List:
         """
         Get all values for a specific column
+        SQLite extracts the field and applies the limit, so only the
+        requested values cross into Python
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_connection()
         cursor = conn.cursor()
         
+        # Match the key with a bound parameter rather than building a JSON
+        # path, which cannot quote keys containing '"'
         cursor.execute('''
-            SELECT data FROM scraped_data WHERE project_id = ?
+            SELECT je.value as value, je.type as type
+            FROM scraped_data sd, json_each(sd.data) je
+            WHERE sd.project_id = ? AND json_valid(sd.data) AND json_type(sd.data) = 'object'
+              AND je.key = ?
             LIMIT ?
-        ''', (project_id, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        ''', (project_id, column_name, limit))
         
         values = []
-        for row in rows:
-            try:
-                data = json.loads(row['data'])
-                if isinstance(data, dict) and column_name in data:
-                    values.append(data[column_name])
-            except:
-                continue
+        append = values.append
+        for row in cursor:
+            value_type = row['type']
+            
+            # Only nested values and booleans need converting back
+            if value_type == 'object' or value_type == 'array':
+                parsed = _load_record(row['value'])
+                append(row['value'] if parsed is None else parsed)
+            elif value_type == 'true' or value_type == 'false':
+                append(value_type == 'true')
+            else:
+                append(row['value'])
         
         return values
     
-    def export_data_csv(self, project_id: int) -> str:
-        """Export project data as CSV"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def export_data_csv(self, project_id: int, out: Optional[TextIO] = None) -> str:
+        """
+        Export project data as CSV
+        Rows are streamed from the cursor; pass a file-like `out` to write
+        there instead of building the whole CSV in memory
+        """
+        conn = self._get_connection()
         cursor = conn.cursor()
         
+        # Let SQLite collect the header so the rows are parsed only once
         cursor.execute('''
-            SELECT data FROM scraped_data WHERE project_id = ?
-            ORDER BY created_at ASC
+            SELECT DISTINCT je.key as key
+            FROM scraped_data sd, json_each(sd.data) je
+            WHERE sd.project_id = ? AND json_valid(sd.data) AND json_type(sd.data) = 'object'
+            ORDER BY je.key
         ''', (project_id,))
         
-        rows = cursor.fetchall()
-        conn.close()
+        fieldnames = [row['key'] for row in cursor.fetchall()]
         
-        if not rows:
+        if not fieldnames:
             return ""
         
-        # Parse data
-        data_list = []
-        all_keys = set()
+        # Generate CSV. The header comes from a separate query, so a row
+        # written since then may carry a new key; drop it rather than raise
+        output = out if out is not None else StringIO()
+        writer = csv.DictWriter(output, fieldnames=fieldnames, restval='', extrasaction='ignore')
+        writer.writeheader()
         
-        for row in rows:
-            try:
-                item = json.loads(row['data'])
-                if isinstance(item, dict):
-                    data_list.append(item)
-                    all_keys.update(item.keys())
-            except:
-                continue
-        
-        if not data_list:
-            return ""
+        cursor.execute('''
+            SELECT data FROM scraped_data
+            WHERE project_id = ? AND json_valid(data) AND json_type(data) = 'object'
+            ORDER BY created_at ASC
+        ''', (project_id,))
         
-        # Generate CSV
-        output = StringIO()
-        fieldnames = sorted(list(all_keys))
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data_list)
+        # SQLite already dropped invalid and non-object rows; a row neither
+        # parser can read is skipped rather than aborting the export
+        records = (_load_record(row['data']) for row in cursor)
+        writer.writerows(record for record in records if record is not None)
         
-        return output.getvalue()
+        return output.getvalue() if out is None else ""
     
-    def export_data_json(self, project_id: int) -> str:
-        """Export project data as JSON"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def export_data_json(self, project_id: int, pretty: bool = False) -> str:
+        """
+        Export project data as JSON
+        SQLite assembles the array itself, so rows are never parsed in
+        Python unless pretty (indented) output is requested
+        """
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT data FROM scraped_data WHERE project_id = ?
-            ORDER BY created_at ASC
+            SELECT json_group_array(json(data)) as data_json
+            FROM (
+                SELECT data FROM scraped_data
+                WHERE project_id = ? AND json_valid(data)
+                ORDER BY created_at ASC
+            )
         ''', (project_id,))
         
-        rows = cursor.fetchall()
-        conn.close()
+        data_json = cursor.fetchone()['data_json']
         
-        data_list = []
-        for row in rows:
-            try:
-                data_list.append(json.loads(row['data']))
-            except:
-                continue
+        if pretty:
+            return orjson.dumps(orjson.loads(data_json), option=orjson.OPT_INDENT_2).decode()
         
-        return json.dumps(data_list, indent=2)
+        return data_json
     
     def _calculate_completion_score(self, stats: Dict) -> float:
         """
         Calculate overall data completion score (0-100)
-        Based on average completion percentage across all fields
+        Based on average completion percentage across all fields. Every
+        field shares the same total_count, so the average reduces to one
+        ratio of summed filled counts over total cells
         """
         if not stats:
             return 0.0
         
-        completions = [s['completion_percentage'] for s in stats.values()]
-        return round(sum(completions) / len(completions), 2) if completions else 0.0
+        filled = sum(s['filled_count'] for s in stats.values())
+        cells = next(iter(stats.values()))['total_count'] * len(stats)
+        return round(filled / cells * 100, 2) if cells else 0.0
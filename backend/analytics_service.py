@@ -114,10 +114,7 @@ class AnalyticsService:
             return self._default_analytics(project_token)
         finally:
             if conn:
-                try:
-                    conn.close()
-                except:
-                    pass
+                self.db.disconnect()
     
     def _default_analytics(self, project_token: str, error: bool = False) -> Dict:
         """Return default analytics structure when no data available"""
@@ -253,15 +250,13 @@ class AnalyticsService:
 
             # Get all data keys
             cursor.execute('''
-                SELECT DISTINCT data_key FROM scraped_data 
+                SELECT DISTINCT data_key FROM scraped_fields 
                 WHERE project_id = ?
             ''', (project_id,))
 
             fields = [row['data_key'] for row in cursor.fetchall()]
 
             if not fields:
-                conn.close()
-                self.db.disconnect()
                 return {'total_fields': 0, 'fields': []}
 
             # Calculate completion percentage for each field
@@ -270,7 +265,7 @@ class AnalyticsService:
                 cursor.execute('''
                     SELECT COUNT(*) as total_records,
                            SUM(CASE WHEN data_value IS NOT NULL AND data_value != '' THEN 1 ELSE 0 END) as filled
-                    FROM scraped_data 
+                    FROM scraped_fields 
                     WHERE project_id = ? AND data_key = ?
                 ''', (project_id, field))
 
@@ -287,9 +282,6 @@ class AnalyticsService:
                     'total_records': total
                 })
 
-            conn.close()
-            self.db.disconnect()
-
             # Calculate average quality
             avg_completion = sum(f['completion_percentage'] for f in field_stats) / len(field_stats) if field_stats else 0
 
@@ -301,6 +293,8 @@ class AnalyticsService:
 
         except Exception as e:
             return {'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def _get_recovery_status(self, recovery_ops: List[Dict]) -> Dict:
         """Get latest recovery status"""
@@ -3,13 +3,18 @@ Flask API Server for ParseHub Real-Time Monitoring
 Exposes REST endpoints for the Next.js frontend to control and monitor real-time data collection
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+import hmac
+import hashlib
 import logging
+import threading
+import time
 from typing import Optional, Dict, List
 import json
+import orjson
 from datetime import datetime
 
 # Load environment variables
@@ -19,6 +24,8 @@ load_dotenv()
 from database import ParseHubDatabase
 from monitoring_service import MonitoringService
 from analytics_service import AnalyticsService
+from scraping_session_service import ScrapingSessionService
+from get_session_progress import get_session_progress
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -32,6 +39,13 @@ logger = logging.getLogger(__name__)
 db = ParseHubDatabase()
 monitoring_service = MonitoringService()
 analytics_service = AnalyticsService()
+scraping_session_service = ScrapingSessionService()
+
+# Incremental-scraping progress is polled every second or two per open tab;
+# identical polls within this window share one serialized response
+PROGRESS_CACHE_TTL = 1.0
+_progress_cache = {}
+_progress_cache_lock = threading.Lock()
 
 # API Key validation
 BACKEND_API_KEY = os.getenv('BACKEND_API_KEY', 't_hmXetfMCq3')
@@ -42,8 +56,9 @@ def validate_api_key(request_obj):
     if not auth_header.startswith('Bearer '):
         return False
     
-    token = auth_header.replace('Bearer ', '')
-    return token == BACKEND_API_KEY
+    # Slice off the prefix and compare in constant time (as bytes, since
+    # compare_digest rejects non-ASCII str)
+    return hmac.compare_digest(auth_header[7:].encode(), BACKEND_API_KEY.encode())
 
 # ========== MONITORING ENDPOINTS ==========
 
@@ -172,6 +187,7 @@ def get_monitor_data():
     - session_id: Monitoring session ID (required)
     - limit: Number of records to fetch (default: 100)
     - offset: Number of records to skip (default: 0)
+    - after_id: Return records after this record ID (overrides offset)
     """
     if not validate_api_key(request):
         return jsonify({'error': 'Unauthorized'}), 401
@@ -180,6 +196,7 @@ def get_monitor_data():
         session_id = request.args.get('session_id', type=int)
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
+        after_id = request.args.get('after_id', type=int)
         
         if not session_id:
             return jsonify({'error': 'Missing required parameter: session_id'}), 400
@@ -189,9 +206,14 @@ def get_monitor_data():
         offset = max(offset, 0)
         
         # Get records from database
-        records = db.get_session_records(session_id, limit, offset)
+        records = db.get_session_records(session_id, limit, offset, after_id)
         total = db.get_session_records_count(session_id)
         
+        if after_id is not None:
+            has_more = len(records) == limit
+        else:
+            has_more = (offset + limit) < total
+        
         return jsonify({
             'success': True,
             'session_id': session_id,
@@ -199,7 +221,9 @@ def get_monitor_data():
             'total': total,
             'limit': limit,
             'offset': offset,
-            'has_more': (offset + limit) < total,
+            'after_id': after_id,
+            'next_after_id': records[-1]['id'] if records else after_id,
+            'has_more': has_more,
         }), 200
     
     except Exception as e:
@@ -224,22 +248,76 @@ def get_monitor_data_csv():
         if not session_id:
             return jsonify({'error': 'Missing required parameter: session_id'}), 400
         
-        # Get CSV data
-        csv_data = db.get_data_as_csv(session_id)
-        
-        if not csv_data:
+        if not db.get_session_records_count(session_id):
             return jsonify({'error': 'No records found for session'}), 404
         
-        return csv_data, 200, {
-            'Content-Type': 'text/csv',
-            'Content-Disposition': f'attachment; filename="session_{session_id}_data.csv"'
-        }
+        # Stream CSV chunks straight from the database cursor
+        return Response(
+            stream_with_context(db.iter_data_as_csv(session_id)),
+            status=200,
+            mimetype='text/csv',
+            headers={
+                'Content-Disposition': f'attachment; filename="session_{session_id}_data.csv"'
+            }
+        )
     
     except Exception as e:
         logger.error(f'Error in /api/monitor/data/csv: {e}')
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/monitor/data/bulk', methods=['POST'])
+def store_monitor_data_bulk():
+    """
+    Store a batch of scraped records for a monitoring session
+    
+    All records are written in a single transaction, so clients should
+    send pages of records here rather than one request per record.
+    
+    Request body:
+    {
+        "session_id": 1,
+        "records": [{...}, ...],
+        "page_number": 1 (optional)
+    }
+    """
+    if not validate_api_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json()
+        session_id = data.get('session_id')
+        records = data.get('records')
+        page_number = data.get('page_number', 1)
+        
+        if not session_id or not isinstance(records, list):
+            return jsonify({'error': 'Missing required fields: session_id, records'}), 400
+        
+        summary = db.get_session_summary(session_id)
+        
+        if not summary:
+            return jsonify({'error': 'Monitoring session not found'}), 404
+        
+        stored = db.store_scraped_records(
+            session_id, summary['project_id'], summary['run_token'], records, page_number
+        )
+        
+        if stored is None:
+            return jsonify({'error': 'Failed to store records'}), 500
+        
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'received': len(records),
+            'stored': stored,
+            'duplicates': len(records) - stored,
+        }), 200
+    
+    except Exception as e:
+        logger.error(f'Error in /api/monitor/data/bulk: {e}')
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/monitor/stop', methods=['POST'])
 def stop_monitoring():
     """
@@ -283,6 +361,53 @@ def stop_monitoring():
         return jsonify({'error': str(e)}), 500
 
 
+# ========== INCREMENTAL SCRAPING ENDPOINTS ==========
+
+@app.route('/api/sessions/progress', methods=['GET'])
+def get_scraping_session_progress():
+    """
+    Get progress of an incremental scraping session
+    
+    Same payload as get_session_progress.py, served from this process so
+    polling clients skip a Python start-up per call. Responses carry an
+    ETag and answer If-None-Match with 304 when nothing changed.
+    
+    Query parameters:
+    - session_id: Scraping session ID (required)
+    """
+    if not validate_api_key(request):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        session_id = request.args.get('session_id', type=int)
+        
+        if not session_id:
+            return jsonify({'error': 'session_id required', 'success': False}), 400
+        
+        now = time.monotonic()
+        with _progress_cache_lock:
+            cached = _progress_cache.get(session_id)
+        
+        if cached and cached[0] > now:
+            body, etag = cached[1], cached[2]
+        else:
+            body = orjson.dumps(get_session_progress(session_id, scraping_session_service))
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            with _progress_cache_lock:
+                # Drop expired entries so closed tabs don't accumulate
+                for key in [k for k, v in _progress_cache.items() if v[0] <= now]:
+                    del _progress_cache[key]
+                _progress_cache[session_id] = (now + PROGRESS_CACHE_TTL, body, etag)
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    
+    except Exception as e:
+        logger.error(f'Error in /api/sessions/progress: {e}')
+        return jsonify({'error': str(e)}), 500
+
+
 # ========== HEALTH CHECK ==========
 
 @app.route('/api/health', methods=['GET'])
@@ -7,9 +7,13 @@ import sys
 import csv
 import json
 import hashlib
+import orjson
 from io import StringIO
 from typing import List, Dict, Tuple
 
+# Serialization options for record hashing, computed once
+_HASH_DUMP_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
 
 class DataConsolidationService:
     """Service for consolidating and deduplicating scraped data"""
@@ -21,14 +25,10 @@ class DataConsolidationService:
         Returns: (headers, records)
         """
         try:
-            lines = csv_text.strip().split('\n')
-            if not lines:
-                return [], []
-
-            # Parse header
-            reader = csv.DictReader(lines)
-            records = list(reader)
-            headers = reader.fieldnames or []
+            # Tokenize straight from a buffer; no intermediate list of lines
+            reader = csv.reader(StringIO(csv_text.strip()))
+            headers = next(reader, [])
+            records = [dict(zip(headers, row)) for row in reader if row]
 
             return headers, records
         except Exception as e:
@@ -42,91 +42,110 @@ class DataConsolidationService:
         Assumes there's a 'page' or 'page_number' column
         """
         try:
-            headers, records = DataConsolidationService.parse_csv_to_records(csv_text)
-
-            if not records:
-                return 0
+            reader = csv.reader(StringIO(csv_text.strip()))
+            headers = next(reader, [])
 
             # Try to find page column
-            page_column = None
-            for header in headers:
+            page_index = None
+            for index, header in enumerate(headers):
                 if 'page' in header.lower():
-                    page_column = header
+                    page_index = index
                     break
 
-            if not page_column:
-                # If no page column, assume all records are from same page
-                return 1
-
-            # Get max page number
+            # Read only the page column; no per-row dicts needed
+            has_records = False
             max_page = 0
-            for record in records:
+            for row in reader:
+                if not row:
+                    continue
+                has_records = True
+
+                if page_index is None or page_index >= len(row):
+                    continue
+
                 try:
-                    page_num = int(record.get(page_column, 0))
-                    max_page = max(max_page, page_num)
-                except (ValueError, TypeError):
+                    max_page = max(max_page, int(row[page_index]))
+                except ValueError:
                     pass
 
+            if not has_records:
+                return 0
+
+            if page_index is None:
+                # If no page column, assume all records are from same page
+                return 1
+
             return max_page if max_page > 0 else 1
         except Exception as e:
             print(f"[WARNING] Error extracting page count: {str(e)}", file=sys.stderr)
             return 1
 
     @staticmethod
-    def generate_record_hash(record: Dict) -> str:
+    def generate_record_hash(record: Dict) -> int:
         """
         Generate hash of a record for deduplication
-        Uses all values to create unique hash
+        Uses all values to create unique hash; a 64-bit BLAKE2b digest
+        returned as an int keeps the seen-sets small and cheap to probe
         """
         try:
-            # Sort and stringify for consistent hashing
-            record_str = json.dumps(record, sort_keys=True, default=str)
-            return hashlib.md5(record_str.encode()).hexdigest()
+            # Sort and serialize straight to bytes for consistent hashing
+            record_bytes = orjson.dumps(record, option=_HASH_DUMP_OPTIONS, default=str)
         except Exception as e:
             print(f"[WARNING] Error generating hash: {str(e)}", file=sys.stderr)
-            return hashlib.md5(json.dumps(record).encode()).hexdigest()
+            record_bytes = json.dumps(record, sort_keys=True, default=str).encode()
+
+        return int.from_bytes(hashlib.blake2b(record_bytes, digest_size=8).digest(), 'big')
 
     @staticmethod
     def merge_csv_data(csv_files: List[str], deduplicate: bool = True) -> Tuple[str, int, int]:
         """
         Merge multiple CSV files
+        Records are written out as they are read rather than collected first
         Returns: (merged_csv, total_records, deduplicated_count)
         """
-        all_records = []
+        output = StringIO()
+        writerow = None
         headers = None
         record_hashes = set()
+        total_records = 0
         duplicates_found = 0
 
+        # Bind hot-loop callables to locals once instead of per record
+        parse_csv_to_records = DataConsolidationService.parse_csv_to_records
+        generate_record_hash = DataConsolidationService.generate_record_hash
+        add_hash = record_hashes.add
+
         try:
             for csv_text in csv_files:
-                csv_headers, records = DataConsolidationService.parse_csv_to_records(csv_text)
+                csv_headers, records = parse_csv_to_records(csv_text)
 
                 # Use first file's headers
                 if headers is None:
                     headers = csv_headers
+                    if not headers:
+                        return "", 0, 0
+
+                    writer = csv.DictWriter(output, fieldnames=headers)
+                    writer.writeheader()
+                    writerow = writer.writerow
 
                 # Add records
                 for record in records:
                     if deduplicate:
-                        record_hash = DataConsolidationService.generate_record_hash(record)
+                        record_hash = generate_record_hash(record)
                         if record_hash in record_hashes:
                             duplicates_found += 1
                             continue
-                        record_hashes.add(record_hash)
+                        add_hash(record_hash)
 
-                    all_records.append(record)
+                    writerow(record)
+                    total_records += 1
 
             if not headers:
                 return "", 0, 0
 
-            # Convert back to CSV
-            output = StringIO()
-            writer = csv.DictWriter(output, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(all_records)
-
             merged_csv = output.getvalue()
-            return merged_csv, len(all_records), duplicates_found
+            return merged_csv, total_records, duplicates_found
 
         except Exception as e:
             print(f"[ERROR] Error merging CSV files: {str(e)}", file=sys.stderr)
@@ -142,6 +161,10 @@ class DataConsolidationService:
         seen = set()
         unique_records = []
         duplicates = 0
+        hash_cache = {}  # id(record) -> hash, so a repeated dict is serialized once
+        generate_record_hash = DataConsolidationService.generate_record_hash
+        add_seen = seen.add
+        append_unique = unique_records.append
 
         try:
             for record in records:
@@ -150,11 +173,13 @@ class DataConsolidationService:
                     key = record[unique_key]
                 else:
                     # Use hash of entire record
-                    key = DataConsolidationService.generate_record_hash(record)
+                    key = hash_cache.get(id(record))
+                    if key is None:
+                        key = hash_cache[id(record)] = generate_record_hash(record)
 
                 if key not in seen:
-                    seen.add(key)
-                    unique_records.append(record)
+                    add_seen(key)
+                    append_unique(record)
                 else:
                     duplicates += 1
 
@@ -199,9 +224,8 @@ class DataConsolidationService:
     def get_record_count(csv_text: str) -> int:
         """Get count of records in CSV (excluding header)"""
         try:
-            lines = csv_text.strip().split('\n')
-            # Subtract 1 for header
-            return max(0, len(lines) - 1)
+            # Line breaks after the header = record lines
+            return csv_text.strip().count('\n')
         except:
             return 0
 
@@ -1,312 +1,712 @@
 import sqlite3
 import json
 import os
+import hashlib
+import threading
+import time
+import zlib
+import orjson
+from itertools import islice
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Hot statements live at module scope so every call passes the identical
+# string and hits sqlite3's per-connection prepared statement cache
+PROJECT_ID_BY_TOKEN_SQL = 'SELECT id FROM projects WHERE token = ?'
+
+INSERT_SCRAPED_SQL = '''
+    INSERT INTO scraped_data (run_id, project_id, data)
+    VALUES (?, ?, ?)
+'''
+
+INSERT_RECORD_SQL = '''
+    INSERT OR IGNORE INTO scraped_records
+    (session_id, project_id, run_token, page_number, data_hash, data_json)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_LINEAGE_SQL = '''
+    INSERT INTO data_lineage
+    (scraped_data_id, source_run_id, recovery_operation_id, product_url, product_hash)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(source_run_id, product_hash) DO NOTHING
+'''
+
+# Tables and indexes, created idempotently by init_db
+SCHEMA_SQL = '''
+    -- Projects table
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        token TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        owner_email TEXT,
+        main_site TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Runs table - tracks each execution
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        run_token TEXT UNIQUE NOT NULL,
+        status TEXT,
+        pages_scraped INTEGER DEFAULT 0,
+        start_time TIMESTAMP,
+        end_time TIMESTAMP,
+        duration_seconds INTEGER,
+        records_count INTEGER DEFAULT 0,
+        data_file TEXT,
+        is_empty BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    );
+
+    -- Scraped data table - stores individual records, one JSON object
+    -- per row in `data` (data_key/data_value hold legacy per-field rows)
+    CREATE TABLE IF NOT EXISTS scraped_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        project_id INTEGER NOT NULL,
+        data_key TEXT,
+        data_value TEXT,
+        data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (run_id) REFERENCES runs(id),
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    );
+
+    -- Key metrics table - for analytics
+    CREATE TABLE IF NOT EXISTS metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        date DATE,
+        total_pages INTEGER DEFAULT 0,
+        total_records INTEGER DEFAULT 0,
+        runs_count INTEGER DEFAULT 0,
+        avg_duration REAL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(project_id, date),
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    );
+
+    -- Recovery operations tracking
+    CREATE TABLE IF NOT EXISTS recovery_operations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        original_run_id INTEGER NOT NULL,
+        recovery_run_id INTEGER,
+        project_id INTEGER NOT NULL,
+        original_project_token TEXT,
+        recovery_project_token TEXT,
+        last_product_url TEXT,
+        last_product_name TEXT,
+        stopped_timestamp TIMESTAMP,
+        recovery_triggered_timestamp TIMESTAMP,
+        recovery_started_timestamp TIMESTAMP,
+        recovery_completed_timestamp TIMESTAMP,
+        status TEXT DEFAULT 'pending',
+        original_data_count INTEGER DEFAULT 0,
+        recovery_data_count INTEGER DEFAULT 0,
+        final_data_count INTEGER DEFAULT 0,
+        duplicates_removed INTEGER DEFAULT 0,
+        attempt_number INTEGER DEFAULT 1,
+        error_message TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects(id),
+        FOREIGN KEY (original_run_id) REFERENCES runs(id),
+        FOREIGN KEY (recovery_run_id) REFERENCES runs(id)
+    );
+
+    -- Data lineage - tracks which data came from which run
+    CREATE TABLE IF NOT EXISTS data_lineage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scraped_data_id INTEGER NOT NULL,
+        source_run_id INTEGER NOT NULL,
+        recovery_operation_id INTEGER,
+        is_duplicate BOOLEAN DEFAULT 0,
+        duplicate_of_data_id INTEGER,
+        product_url TEXT,
+        product_hash TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (scraped_data_id) REFERENCES scraped_data(id),
+        FOREIGN KEY (source_run_id) REFERENCES runs(id),
+        FOREIGN KEY (recovery_operation_id) REFERENCES recovery_operations(id)
+    );
+
+    -- Run checkpoints - track progress snapshots
+    CREATE TABLE IF NOT EXISTS run_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        snapshot_timestamp TIMESTAMP,
+        item_count_at_time INTEGER,
+        items_per_minute REAL,
+        estimated_completion_time TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (run_id) REFERENCES runs(id)
+    );
+
+    -- Pagination checkpoints - latest page reached / target pages per project
+    CREATE TABLE IF NOT EXISTS pagination_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        checkpoint_type TEXT NOT NULL,
+        checkpoint_data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(project_id, checkpoint_type),
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    );
+
+    -- Monitoring sessions - tracks real-time monitoring data collection
+    CREATE TABLE IF NOT EXISTS monitoring_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        run_token TEXT NOT NULL,
+        target_pages INTEGER DEFAULT 1,
+        status TEXT DEFAULT 'active',
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        end_time TIMESTAMP,
+        total_records INTEGER DEFAULT 0,
+        total_pages INTEGER DEFAULT 0,
+        progress_percentage REAL DEFAULT 0,
+        current_url TEXT,
+        error_message TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    );
+
+    -- Enhanced scraped records with page and session tracking
+    CREATE TABLE IF NOT EXISTS scraped_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL,
+        project_id INTEGER NOT NULL,
+        run_token TEXT NOT NULL,
+        page_number INTEGER,
+        data_hash TEXT,
+        data_json TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES monitoring_sessions(id),
+        FOREIGN KEY (project_id) REFERENCES projects(id),
+        UNIQUE(run_token, page_number, data_hash)
+    );
+
+    -- Per-session record and page counts, kept current by the triggers
+    -- below so the monitoring endpoints never COUNT(*) scraped_records
+    CREATE TABLE IF NOT EXISTS session_record_counts (
+        session_id INTEGER PRIMARY KEY,
+        record_count INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS session_pages (
+        session_id INTEGER NOT NULL,
+        page_number INTEGER NOT NULL,
+        record_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (session_id, page_number)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_scraped_records_counts_insert
+    AFTER INSERT ON scraped_records
+    BEGIN
+        INSERT INTO session_record_counts (session_id, record_count)
+        VALUES (NEW.session_id, 1)
+        ON CONFLICT(session_id) DO UPDATE SET record_count = record_count + 1;
+
+        INSERT INTO session_pages (session_id, page_number, record_count)
+        SELECT NEW.session_id, NEW.page_number, 1
+        WHERE NEW.page_number IS NOT NULL
+        ON CONFLICT(session_id, page_number) DO UPDATE SET record_count = record_count + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_scraped_records_counts_delete
+    AFTER DELETE ON scraped_records
+    BEGIN
+        UPDATE session_record_counts SET record_count = record_count - 1
+        WHERE session_id = OLD.session_id;
+
+        UPDATE session_pages SET record_count = record_count - 1
+        WHERE session_id = OLD.session_id AND page_number = OLD.page_number;
+
+        DELETE FROM session_pages
+        WHERE session_id = OLD.session_id AND page_number = OLD.page_number
+          AND record_count <= 0;
+    END;
+
+    -- Analytics cache - stores complete analytics data
+    CREATE TABLE IF NOT EXISTS analytics_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_token TEXT UNIQUE NOT NULL,
+        run_token TEXT,
+        total_records INTEGER DEFAULT 0,
+        total_fields INTEGER DEFAULT 0,
+        total_runs INTEGER DEFAULT 0,
+        completed_runs INTEGER DEFAULT 0,
+        progress_percentage REAL DEFAULT 0,
+        status TEXT,
+        analytics_json TEXT,
+        stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- CSV exports - stores complete CSV data for export
+    CREATE TABLE IF NOT EXISTS csv_exports (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_token TEXT NOT NULL,
+        run_token TEXT,
+        csv_data TEXT,
+        row_count INTEGER DEFAULT 0,
+        stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(project_token, run_token)
+    );
+
+    -- Analytics records - individual scraped records for display
+    CREATE TABLE IF NOT EXISTS analytics_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_token TEXT NOT NULL,
+        run_token TEXT NOT NULL,
+        record_index INTEGER,
+        record_data TEXT NOT NULL,
+        stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(project_token, run_token, record_index)
+    );
+
+    -- Incremental scraping sessions - tracks overall scraping campaign
+    CREATE TABLE IF NOT EXISTS scraping_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_token TEXT NOT NULL,
+        project_name TEXT NOT NULL,
+        total_pages_target INTEGER NOT NULL,
+        current_iteration INTEGER DEFAULT 1,
+        pages_completed INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'running',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        UNIQUE(project_token, total_pages_target)
+    );
+
+    -- Iteration runs - tracks each ParseHub run in the session
+    CREATE TABLE IF NOT EXISTS iteration_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL,
+        iteration_number INTEGER NOT NULL,
+        parsehub_project_token TEXT NOT NULL,
+        parsehub_project_name TEXT NOT NULL,
+        start_page_number INTEGER NOT NULL,
+        end_page_number INTEGER NOT NULL,
+        pages_in_this_run INTEGER NOT NULL,
+        run_token TEXT NOT NULL,
+        csv_data TEXT,
+        records_count INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES scraping_sessions(id)
+    );
+
+    -- Combined scraped data - consolidated final results
+    CREATE TABLE IF NOT EXISTS combined_scraped_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER NOT NULL,
+        consolidated_csv TEXT,
+        total_records INTEGER DEFAULT 0,
+        total_pages_scraped INTEGER DEFAULT 0,
+        deduplicated_record_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(session_id),
+        FOREIGN KEY (session_id) REFERENCES scraping_sessions(id)
+    );
+
+    -- URL patterns - store detected patterns for pagination
+    CREATE TABLE IF NOT EXISTS url_patterns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_token TEXT UNIQUE NOT NULL,
+        original_url TEXT NOT NULL,
+        pattern_type TEXT,
+        pattern_regex TEXT,
+        last_page_placeholder TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (project_token) REFERENCES projects(token)
+    );
+
+    -- Indexes for the per-project / per-run "newest first" lookups
+    CREATE INDEX IF NOT EXISTS idx_runs_project_created
+    ON runs(project_id, created_at DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_scraped_data_run_created
+    ON scraped_data(run_id, created_at DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_scraped_data_project
+    ON scraped_data(project_id);
+
+    CREATE INDEX IF NOT EXISTS idx_scraped_data_run_key
+    ON scraped_data(run_id, data_key, data_value);
+
+    CREATE INDEX IF NOT EXISTS idx_recovery_ops_project_created
+    ON recovery_operations(project_id, created_at DESC);
+
+    -- Session paging walks records in id order; the rowid rides along in
+    -- every index entry so this serves both the seek and the ordering
+    CREATE INDEX IF NOT EXISTS idx_scraped_records_session
+    ON scraped_records(session_id);
+
+    CREATE INDEX IF NOT EXISTS idx_monitoring_sessions_project_created
+    ON monitoring_sessions(project_id, created_at DESC);
+
+    CREATE INDEX IF NOT EXISTS idx_iteration_runs_session
+    ON iteration_runs(session_id, iteration_number);
+
+    -- The session monitor polls running sessions that still have pages left
+    CREATE INDEX IF NOT EXISTS idx_scraping_sessions_status
+    ON scraping_sessions(status, pages_completed);
+'''
+
+
+_RECORD_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS
+_SORTED_RECORD_DUMP_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _dump_record(record, sort_keys: bool = False) -> str:
+    """Serialize a scraped record to JSON text (orjson, stdlib json as fallback)"""
+    options = _SORTED_RECORD_DUMP_OPTIONS if sort_keys else _RECORD_DUMP_OPTIONS
+    try:
+        return orjson.dumps(record, default=str, option=options).decode()
+    except TypeError:
+        # e.g. integers beyond 64 bits
+        return json.dumps(record, default=str, sort_keys=sort_keys)
+
+
+def _normalize_record_json(record_json: str) -> str:
+    """Re-serialize stored record JSON in the form store_scraped_records writes"""
+    return _dump_record(json.loads(record_json), sort_keys=True)
+
+
+def _record_hash(record_json: str) -> str:
+    """Dedup key for a serialized scraped record (not a security hash)"""
+    return hashlib.blake2b(record_json.encode(), digest_size=16).hexdigest()
+
+
+def _compress_text(text: str) -> bytes:
+    """Compress a large text payload for storage as a BLOB"""
+    return zlib.compress(text.encode(), 6)
+
+
+def _decompress_text(value) -> str:
+    """Inverse of _compress_text; rows written before compression are plain text"""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode()
+    return value
+
+
+# update_monitoring_session SQL, keyed by (fields set, sets end_time)
+_SESSION_UPDATE_SQL = {}
+
+# Session summaries are polled by the dashboard; serve repeats from memory.
+# Finished sessions no longer change, so they are kept much longer.
+SESSION_SUMMARY_TTL = 2.0
+SESSION_SUMMARY_FINAL_TTL = 60.0
+SESSION_SUMMARY_CACHE_SIZE = 512
+
+# Files below this size are imported with a plain json.load
+STREAM_IMPORT_THRESHOLD = 1024 * 1024
+
+
+# Characters that can legally follow a complete JSON number
+_JSON_NUMBER_END = frozenset(',]} \t\n\r')
+
+
+def _iter_json_records(f, chunk_size: int = 65536):
+    """
+    Yield record dicts from a JSON export without loading the whole file.
+    Accepts a top-level array of records, or an object whose first
+    array-of-objects value holds the records (like { "product": [...] }),
+    mirroring what store_scraped_data accepts
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buf) or not read_more():
+                return buf[pos:pos + 1]
+
+    def next_value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A number cut at the buffer edge ("12." or "2.5e") decodes as
+                # its prefix; accept it only once a delimiter follows it
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if eof or (end < len(buf) and (not is_number or buf[end] in _JSON_NUMBER_END)):
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more()
+
+    def expect(chars):
+        nonlocal pos
+        char = peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", buf, pos)
+        pos += 1
+        return char
+
+    def array_items():
+        nonlocal pos
+        if peek() == ']':
+            pos += 1
+            return
+        while True:
+            yield next_value()
+            if expect(',]') == ']':
+                return
+
+    start = expect('[{')
+
+    if start == '[':
+        for item in array_items():
+            if isinstance(item, dict):
+                yield item
+        return
+
+    if peek() == '}':
+        return
+
+    while True:
+        next_value()
+        expect(':')
+
+        if peek() == '[':
+            pos += 1
+            items = array_items()
+            first = next(items, None)
+            if isinstance(first, dict):
+                # This is the data array
+                yield first
+                yield from (item for item in items if isinstance(item, dict))
+                return
+            for _ in items:
+                pass
+        else:
+            next_value()
+
+        if expect(',}') == '}':
+            return
+
+
 class ParseHubDatabase:
     def __init__(self, db_path: str = None):
         if db_path is None:
             db_path = os.getenv('DATABASE_PATH', 'd:\\Parsehub\\parsehub.db')
         self.db_path = db_path
-        self.conn = None
+        self._local = threading.local()
+        self._wal_enabled = False
+        self._project_id_cache = {}
+        self._summary_cache = {}
+        self._summary_lock = threading.Lock()
         self.init_db()
 
     def connect(self):
-        """Connect to database"""
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
-        return self.conn
+        """
+        Get this thread's database connection, opening it on first use.
+        The connection stays open across calls so the page cache, PRAGMAs
+        and prepared statements survive; it is reopened if a caller closed it
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.total_changes
+                self._local.depth += 1
+                return conn
+            except sqlite3.ProgrammingError:
+                pass
+
+        conn = sqlite3.connect(self.db_path, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        self._apply_pragmas(conn)
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def _apply_pragmas(self, conn):
+        """
+        Tune a fresh connection: WAL so readers don't block on writers,
+        one fsync per commit, in-memory temp tables, a 64MB page cache,
+        memory-mapped reads and a busy timeout instead of instant locks
+        """
+        # journal_mode is stored in the database file, so set it only once
+        if not self._wal_enabled:
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._wal_enabled = True
+
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA busy_timeout=5000')
 
     def disconnect(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """
+        Finish a unit of work. The connection is kept open for reuse;
+        anything left uncommitted is rolled back, as closing it used to do.
+        Nested calls (a method calling another mid-transaction) only unwind
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth = max(self._local.depth - 1, 0)
+            if self._local.depth:
+                return
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.ProgrammingError:
+                self._local.conn = None
+
+    def close(self):
+        """Close this thread's database connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def init_db(self):
         """Initialize database schema"""
         conn = self.connect()
-        cursor = conn.cursor()
-
-        # Projects table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                token TEXT UNIQUE NOT NULL,
-                title TEXT NOT NULL,
-                owner_email TEXT,
-                main_site TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Runs table - tracks each execution
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS runs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER NOT NULL,
-                run_token TEXT UNIQUE NOT NULL,
-                status TEXT,
-                pages_scraped INTEGER DEFAULT 0,
-                start_time TIMESTAMP,
-                end_time TIMESTAMP,
-                duration_seconds INTEGER,
-                records_count INTEGER DEFAULT 0,
-                data_file TEXT,
-                is_empty BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects(id)
-            )
-        ''')
-
-        # Scraped data table - stores individual records
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraped_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_id INTEGER NOT NULL,
-                project_id INTEGER NOT NULL,
-                data_key TEXT,
-                data_value TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (run_id) REFERENCES runs(id),
-                FOREIGN KEY (project_id) REFERENCES projects(id)
-            )
-        ''')
 
-        # Key metrics table - for analytics
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER NOT NULL,
-                date DATE,
-                total_pages INTEGER DEFAULT 0,
-                total_records INTEGER DEFAULT 0,
-                runs_count INTEGER DEFAULT 0,
-                avg_duration REAL DEFAULT 0,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(project_id, date),
-                FOREIGN KEY (project_id) REFERENCES projects(id)
-            )
-        ''')
-
-        # Recovery operations tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS recovery_operations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                original_run_id INTEGER NOT NULL,
-                recovery_run_id INTEGER,
-                project_id INTEGER NOT NULL,
-                original_project_token TEXT,
-                recovery_project_token TEXT,
-                last_product_url TEXT,
-                last_product_name TEXT,
-                stopped_timestamp TIMESTAMP,
-                recovery_triggered_timestamp TIMESTAMP,
-                recovery_started_timestamp TIMESTAMP,
-                recovery_completed_timestamp TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                original_data_count INTEGER DEFAULT 0,
-                recovery_data_count INTEGER DEFAULT 0,
-                final_data_count INTEGER DEFAULT 0,
-                duplicates_removed INTEGER DEFAULT 0,
-                attempt_number INTEGER DEFAULT 1,
-                error_message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects(id),
-                FOREIGN KEY (original_run_id) REFERENCES runs(id),
-                FOREIGN KEY (recovery_run_id) REFERENCES runs(id)
-            )
-        ''')
-
-        # Data lineage - tracks which data came from which run
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS data_lineage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                scraped_data_id INTEGER NOT NULL,
-                source_run_id INTEGER NOT NULL,
-                recovery_operation_id INTEGER,
-                is_duplicate BOOLEAN DEFAULT 0,
-                duplicate_of_data_id INTEGER,
-                product_url TEXT,
-                product_hash TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (scraped_data_id) REFERENCES scraped_data(id),
-                FOREIGN KEY (source_run_id) REFERENCES runs(id),
-                FOREIGN KEY (recovery_operation_id) REFERENCES recovery_operations(id)
-            )
-        ''')
-
-        # Run checkpoints - track progress snapshots
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS run_checkpoints (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_id INTEGER NOT NULL,
-                snapshot_timestamp TIMESTAMP,
-                item_count_at_time INTEGER,
-                items_per_minute REAL,
-                estimated_completion_time TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (run_id) REFERENCES runs(id)
-            )
-        ''')
-
-        # Monitoring sessions - tracks real-time monitoring data collection
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monitoring_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER NOT NULL,
-                run_token TEXT NOT NULL,
-                target_pages INTEGER DEFAULT 1,
-                status TEXT DEFAULT 'active',
-                start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                end_time TIMESTAMP,
-                total_records INTEGER DEFAULT 0,
-                total_pages INTEGER DEFAULT 0,
-                progress_percentage REAL DEFAULT 0,
-                current_url TEXT,
-                error_message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects(id)
-            )
-        ''')
-
-        # Enhanced scraped records with page and session tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraped_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                project_id INTEGER NOT NULL,
-                run_token TEXT NOT NULL,
-                page_number INTEGER,
-                data_hash TEXT,
-                data_json TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES monitoring_sessions(id),
-                FOREIGN KEY (project_id) REFERENCES projects(id),
-                UNIQUE(run_token, page_number, data_hash)
-            )
-        ''')
+        # Create everything in one transaction (one fsync instead of one per
+        # statement); the migrations below run inside it before the commit
+        conn.executescript('BEGIN;\n' + SCHEMA_SQL)
+        cursor = conn.cursor()
 
-        # Analytics cache - stores complete analytics data
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analytics_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_token TEXT UNIQUE NOT NULL,
-                run_token TEXT,
-                total_records INTEGER DEFAULT 0,
-                total_fields INTEGER DEFAULT 0,
-                total_runs INTEGER DEFAULT 0,
-                completed_runs INTEGER DEFAULT 0,
-                progress_percentage REAL DEFAULT 0,
-                status TEXT,
-                analytics_json TEXT,
-                stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        # table_xinfo also lists generated columns
+        cursor.execute('PRAGMA table_xinfo(scraped_data)')
+        columns = {row['name'] for row in cursor.fetchall()}
 
-        # CSV exports - stores complete CSV data for export
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS csv_exports (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_token TEXT NOT NULL,
-                run_token TEXT,
-                csv_data TEXT,
-                row_count INTEGER DEFAULT 0,
-                stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(project_token, run_token)
-            )
-        ''')
+        if 'data' not in columns:
+            cursor.execute('ALTER TABLE scraped_data ADD COLUMN data TEXT')
 
-        # Analytics records - individual scraped records for display
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analytics_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_token TEXT NOT NULL,
-                run_token TEXT NOT NULL,
-                record_index INTEGER,
-                record_data TEXT NOT NULL,
-                stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(project_token, run_token, record_index)
-            )
-        ''')
+        # Page number of JSON records as an indexable virtual column
+        # (same definition AdvancedAnalyticsService migrates to)
+        if 'page_number_ext' not in columns:
+            cursor.execute('''
+                ALTER TABLE scraped_data ADD COLUMN page_number_ext INTEGER
+                GENERATED ALWAYS AS (
+                    CASE WHEN json_valid(data)
+                         THEN CAST(json_extract(data, '$.page_number') AS INTEGER)
+                    END
+                ) VIRTUAL
+            ''')
 
-        # Incremental scraping sessions - tracks overall scraping campaign
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraping_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_token TEXT NOT NULL,
-                project_name TEXT NOT NULL,
-                total_pages_target INTEGER NOT NULL,
-                current_iteration INTEGER DEFAULT 1,
-                pages_completed INTEGER DEFAULT 0,
-                status TEXT DEFAULT 'running',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                UNIQUE(project_token, total_pages_target)
-            )
+            CREATE INDEX IF NOT EXISTS idx_scraped_project_page
+            ON scraped_data(project_id, page_number_ext)
         ''')
 
-        # Iteration runs - tracks each ParseHub run in the session
+        # Field-level view over scraped_data: expands JSON records into
+        # (data_key, data_value) pairs and passes legacy rows through
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS iteration_runs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                iteration_number INTEGER NOT NULL,
-                parsehub_project_token TEXT NOT NULL,
-                parsehub_project_name TEXT NOT NULL,
-                start_page_number INTEGER NOT NULL,
-                end_page_number INTEGER NOT NULL,
-                pages_in_this_run INTEGER NOT NULL,
-                run_token TEXT NOT NULL,
-                csv_data TEXT,
-                records_count INTEGER DEFAULT 0,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES scraping_sessions(id)
-            )
+            CREATE VIEW IF NOT EXISTS scraped_fields AS
+            SELECT sd.id, sd.run_id, sd.project_id,
+                   je.key as data_key,
+                   CASE je.type
+                       WHEN 'true' THEN 'True'
+                       WHEN 'false' THEN 'False'
+                       ELSE CAST(je.value AS TEXT)
+                   END as data_value,
+                   sd.created_at
+            FROM scraped_data sd, json_each(sd.data) je
+            WHERE sd.data IS NOT NULL
+            UNION ALL
+            SELECT id, run_id, project_id, data_key, data_value, created_at
+            FROM scraped_data
+            WHERE data IS NULL
         ''')
 
-        # Combined scraped data - consolidated final results
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS combined_scraped_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                consolidated_csv TEXT,
-                total_records INTEGER DEFAULT 0,
-                total_pages_scraped INTEGER DEFAULT 0,
-                deduplicated_record_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(session_id),
-                FOREIGN KEY (session_id) REFERENCES scraping_sessions(id)
-            )
-        ''')
-
-        # URL patterns - store detected patterns for pagination
+        # Version 1: scraped_records.data_hash moved from MD5 to BLAKE2b.
+        # data_json is exactly the hashed text, so existing rows are rehashed
+        # once and keep deduplicating against new inserts
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] < 1:
+            conn.create_function('record_hash', 1, _record_hash, deterministic=True)
+            cursor.execute('UPDATE scraped_records SET data_hash = record_hash(data_json)')
+            cursor.execute('PRAGMA user_version = 1')
+
+        # Version 2: records are serialized with orjson (compact, UTF-8) rather
+        # than json.dumps, so existing rows are rewritten the same way to keep
+        # deduplicating against them. Rows that turn out to be duplicates are
+        # left as they were
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] < 2:
+            conn.create_function('record_hash', 1, _record_hash, deterministic=True)
+            conn.create_function('normalize_record', 1, _normalize_record_json, deterministic=True)
+            cursor.execute('''
+                UPDATE OR IGNORE scraped_records
+                SET data_json = normalize_record(data_json),
+                    data_hash = record_hash(normalize_record(data_json))
+            ''')
+            cursor.execute('PRAGMA user_version = 2')
+
+        # Version 3: session counters are trigger-maintained; fill them in
+        # for records stored before the triggers existed
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] < 3:
+            cursor.execute('DELETE FROM session_record_counts')
+            cursor.execute('DELETE FROM session_pages')
+            cursor.execute('''
+                INSERT INTO session_record_counts (session_id, record_count)
+                SELECT session_id, COUNT(*) FROM scraped_records GROUP BY session_id
+            ''')
+            cursor.execute('''
+                INSERT INTO session_pages (session_id, page_number, record_count)
+                SELECT session_id, page_number, COUNT(*) FROM scraped_records
+                WHERE page_number IS NOT NULL
+                GROUP BY session_id, page_number
+            ''')
+            cursor.execute('PRAGMA user_version = 3')
+
+        # One lineage row per product per run. Older databases may already
+        # hold duplicates, which have to go before the unique index can exist
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS url_patterns (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_token TEXT UNIQUE NOT NULL,
-                original_url TEXT NOT NULL,
-                pattern_type TEXT,
-                pattern_regex TEXT,
-                last_page_placeholder TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_token) REFERENCES projects(token)
-            )
+            SELECT 1 FROM sqlite_master
+            WHERE type = 'index' AND name = 'idx_data_lineage_run_hash'
         ''')
+        if not cursor.fetchone():
+            cursor.execute('''
+                DELETE FROM data_lineage WHERE id NOT IN (
+                    SELECT MIN(id) FROM data_lineage GROUP BY source_run_id, product_hash
+                )
+            ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX idx_data_lineage_run_hash
+                ON data_lineage(source_run_id, product_hash)
+            ''')
 
         conn.commit()
         self.disconnect()
@@ -316,29 +716,53 @@ class ParseHubDatabase:
         conn = self.connect()
         cursor = conn.cursor()
 
+        # Update in place so the project keeps its id (runs reference it)
         cursor.execute('''
-            INSERT OR REPLACE INTO projects (token, title, owner_email, main_site, updated_at)
+            INSERT INTO projects (token, title, owner_email, main_site, updated_at)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(token) DO UPDATE SET
+                title = excluded.title,
+                owner_email = excluded.owner_email,
+                main_site = excluded.main_site,
+                updated_at = excluded.updated_at
         ''', (token, title, owner_email, main_site))
 
         conn.commit()
         self.disconnect()
 
+    def _get_project_id(self, cursor, project_token: str):
+        """Resolve a project token to its id; ids never change, so hits are cached"""
+        project_id = self._project_id_cache.get(project_token)
+
+        if project_id is None:
+            cursor.execute(PROJECT_ID_BY_TOKEN_SQL, (project_token,))
+            project = cursor.fetchone()
+            if not project:
+                return None
+            project_id = self._project_id_cache[project_token] = project['id']
+
+        return project_id
+
     def add_run(self, project_token: str, run_token: str, status: str, pages: int, 
                 start_time: str, end_time: str = None, data_file: str = None, is_empty: bool = False):
         """Add a new run record"""
         conn = self.connect()
         cursor = conn.cursor()
 
-        # Get project ID
-        cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
-        project = cursor.fetchone()
-        
-        if not project:
-            self.disconnect()
-            return None
+        run_id = self._insert_run(cursor, project_token, run_token, status, pages,
+                                  start_time, end_time, data_file, is_empty)
+        if run_id:
+            self._refresh_metrics(cursor, run_id)
+
+        conn.commit()
+        self.disconnect()
 
-        project_id = project['id']
+        return run_id
+
+    def _insert_run(self, cursor, project_token: str, run_token: str, status: str, pages: int,
+                    start_time: str, end_time: str = None, data_file: str = None,
+                    is_empty: bool = False):
+        """Insert a run row without committing; returns its id, or None for an unknown project"""
         duration = None
 
         if start_time and end_time:
@@ -349,17 +773,87 @@ class ParseHubDatabase:
             except:
                 pass
 
+        # Resolve the project inside the insert; no row comes back if the
+        # token is unknown
         cursor.execute('''
             INSERT INTO runs 
             (project_id, run_token, status, pages_scraped, start_time, end_time, duration_seconds, data_file, is_empty)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (project_id, run_token, status, pages, start_time, end_time, duration, data_file, is_empty))
+            SELECT id, ?, ?, ?, ?, ?, ?, ?, ? FROM projects WHERE token = ?
+            RETURNING id
+        ''', (run_token, status, pages, start_time, end_time, duration, data_file, is_empty, project_token))
+        run = cursor.fetchone()
 
-        conn.commit()
-        run_id = cursor.lastrowid
-        self.disconnect()
+        return run['id'] if run else None
 
-        return run_id
+    def _insert_scraped_records(self, cursor, run_id: int, project_id: int, items,
+                                batch_size: int = 5000) -> int:
+        """
+        Insert records (any iterable of dicts) in executemany batches.
+        One row per record; fields stay queryable through json_extract
+        and the scraped_fields view
+        """
+        items = iter(items)
+        records = 0
+
+        while True:
+            batch = [
+                (run_id, project_id, _dump_record(item))
+                for item in islice(items, batch_size)
+            ]
+            if not batch:
+                return records
+            cursor.executemany(INSERT_SCRAPED_SQL, batch)
+            records += len(batch)
+
+    def _refresh_metrics(self, cursor, run_id: int):
+        """
+        Recompute the daily metrics row for the project/day of a run.
+        Only that day's runs are read (via idx_runs_project_created), so
+        the metrics table stays exact without rescanning all runs
+        """
+        cursor.execute('''
+            INSERT INTO metrics
+            (project_id, date, total_pages, total_records, runs_count, avg_duration, updated_at)
+            SELECT r.project_id, d.day,
+                   COALESCE(SUM(r.pages_scraped), 0),
+                   COALESCE(SUM(r.records_count), 0),
+                   COUNT(*),
+                   COALESCE(AVG(r.duration_seconds), 0),
+                   CURRENT_TIMESTAMP
+            FROM (SELECT project_id, date(created_at) as day FROM runs WHERE id = ?) d
+            JOIN runs r ON r.project_id = d.project_id
+                       AND r.created_at >= d.day
+                       AND r.created_at < date(d.day, '+1 day')
+            GROUP BY r.project_id, d.day
+            ON CONFLICT(project_id, date) DO UPDATE SET
+                total_pages = excluded.total_pages,
+                total_records = excluded.total_records,
+                runs_count = excluded.runs_count,
+                avg_duration = excluded.avg_duration,
+                updated_at = excluded.updated_at
+        ''', (run_id,))
+
+    def get_project_metrics(self, project_token: str, days: int = 30) -> list:
+        """Get daily run metrics for a project, oldest first"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        project_id = self._get_project_id(cursor, project_token)
+
+        if project_id is None:
+            self.disconnect()
+            return []
+
+        cursor.execute('''
+            SELECT date, total_pages, total_records, runs_count, avg_duration
+            FROM metrics
+            WHERE project_id = ? AND date >= date('now', ?)
+            ORDER BY date ASC
+        ''', (project_id, f'-{int(days)} days'))
+
+        metrics = [dict(row) for row in cursor.fetchall()]
+        self.disconnect()
+        return metrics
 
     def store_scraped_data(self, run_id: int, project_id: int = None, data: dict | list = None):
         """Store scraped data from JSON"""
@@ -376,34 +870,24 @@ class ParseHubDatabase:
                 self.disconnect()
                 return 0
 
-        records = 0
+        items = []
 
         if isinstance(data, list):
             # Array of records
-            for item in data:
-                if isinstance(item, dict):
-                    for key, value in item.items():
-                        cursor.execute('''
-                            INSERT INTO scraped_data (run_id, project_id, data_key, data_value)
-                            VALUES (?, ?, ?, ?)
-                        ''', (run_id, project_id, key, str(value)))
-                    records += 1
+            items = [item for item in data if isinstance(item, dict)]
         elif isinstance(data, dict):
             # Check if it contains an array (like { product: [...] })
             for key, value in data.items():
                 if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
                     # This is the data array
-                    for item in value:
-                        for field, field_value in item.items():
-                            cursor.execute('''
-                                INSERT INTO scraped_data (run_id, project_id, data_key, data_value)
-                                VALUES (?, ?, ?, ?)
-                            ''', (run_id, project_id, field, str(field_value)))
-                        records += 1
+                    items = value
                     break
 
+        records = self._insert_scraped_records(cursor, run_id, project_id, items)
+
         # Update records count in runs table
         cursor.execute('UPDATE runs SET records_count = ? WHERE id = ?', (records, run_id))
+        self._refresh_metrics(cursor, run_id)
 
         conn.commit()
         self.disconnect()
@@ -415,15 +899,12 @@ class ParseHubDatabase:
         conn = self.connect()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
-        project = cursor.fetchone()
+        project_id = self._get_project_id(cursor, project_token)
 
-        if not project:
+        if project_id is None:
             self.disconnect()
             return None
 
-        project_id = project['id']
-
         # Total runs
         cursor.execute('SELECT COUNT(*) as count FROM runs WHERE project_id = ?', (project_id,))
         total_runs = cursor.fetchone()['count']
@@ -475,13 +956,61 @@ class ParseHubDatabase:
         conn = self.connect()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT token FROM projects')
+        # Counts, sums and averages for every project in one grouped pass
+        cursor.execute('''
+            SELECT p.id, p.token,
+                   COUNT(r.id) as total_runs,
+                   SUM(CASE WHEN r.status = 'complete' THEN 1 ELSE 0 END) as completed_runs,
+                   COALESCE(SUM(r.records_count), 0) as total_records,
+                   AVG(CASE WHEN r.status = 'complete' THEN r.duration_seconds END) as avg_duration
+            FROM projects p
+            LEFT JOIN runs r ON r.project_id = p.id
+            GROUP BY p.id
+            ORDER BY p.id
+        ''')
         projects = cursor.fetchall()
+
+        # Last 10 runs per project, newest first (the first one is the latest run)
+        cursor.execute('''
+            SELECT project_id, run_token, status, pages_scraped, start_time, records_count
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY project_id ORDER BY created_at DESC
+                ) as rn
+                FROM runs
+            )
+            WHERE rn <= 10
+            ORDER BY project_id, rn
+        ''')
+        recent_runs = {}
+        for row in cursor.fetchall():
+            recent_runs.setdefault(row['project_id'], []).append(row)
+
         self.disconnect()
 
         analytics = []
         for project in projects:
-            analytics.append(self.get_project_analytics(project['token']))
+            runs = recent_runs.get(project['id'], [])
+            latest_run = runs[0] if runs else None
+
+            analytics.append({
+                'project_token': project['token'],
+                'total_runs': project['total_runs'],
+                'completed_runs': project['completed_runs'],
+                'total_records': int(project['total_records']),
+                'avg_duration': round(project['avg_duration'] or 0, 2),
+                'latest_run': {
+                    'run_token': latest_run['run_token'],
+                    'status': latest_run['status'],
+                    'pages_scraped': latest_run['pages_scraped'],
+                    'start_time': latest_run['start_time'],
+                    'records_count': latest_run['records_count']
+                } if latest_run else None,
+                'pages_trend': [
+                    {'pages_scraped': run['pages_scraped'], 'start_time': run['start_time']}
+                    for run in runs
+                ]
+            })
 
         return analytics
 
@@ -489,20 +1018,24 @@ class ParseHubDatabase:
                         status: str, pages: int, start_time: str, end_time: str = None):
         """Import data from JSON file into database"""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
             # Ensure project exists
             conn = self.connect()
             cursor = conn.cursor()
-            cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
-            project = cursor.fetchone()
+            project_id = self._get_project_id(cursor, project_token)
             self.disconnect()
 
-            if not project:
+            if project_id is None:
                 return None
 
-            project_id = project['id']
+            if os.path.getsize(json_file) >= STREAM_IMPORT_THRESHOLD:
+                return self._stream_import_json(json_file, project_id, project_token, run_token,
+                                                status, pages, start_time, end_time)
+
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            # Empty export: nothing at all, or an object whose values are all empty
+            is_empty = not data or (isinstance(data, dict) and not any(data.values()))
 
             # Add run record
             run_id = self.add_run(
@@ -513,7 +1046,7 @@ class ParseHubDatabase:
                 start_time=start_time,
                 end_time=end_time,
                 data_file=json_file,
-                is_empty=len(str(data)) < 10
+                is_empty=is_empty
             )
 
             if run_id:
@@ -524,20 +1057,49 @@ class ParseHubDatabase:
             print(f"Error importing JSON: {e}")
             return None
 
+    def _stream_import_json(self, json_file: str, project_id: int, project_token: str, run_token: str,
+                            status: str, pages: int, start_time: str, end_time: str = None):
+        """
+        Import a large JSON export record by record, in one transaction.
+        The run row is part of that transaction, so a parse error leaves
+        no orphan run behind to block a retry with the same run_token
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            run_id = self._insert_run(cursor, project_token, run_token, status, pages,
+                                      start_time, end_time, json_file)
+            if not run_id:
+                conn.rollback()
+                return None
+
+            with open(json_file, 'r', encoding='utf-8') as f:
+                records = self._insert_scraped_records(cursor, run_id, project_id, _iter_json_records(f))
+
+            cursor.execute('UPDATE runs SET records_count = ?, is_empty = ? WHERE id = ?',
+                           (records, records == 0, run_id))
+            self._refresh_metrics(cursor, run_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.disconnect()
+
+        return {'run_id': run_id, 'records': records}
+
     def export_data(self, project_token: str, format: str = 'json') -> str | None:
         """Export all project data"""
         conn = self.connect()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
-        project = cursor.fetchone()
+        project_id = self._get_project_id(cursor, project_token)
 
-        if not project:
+        if project_id is None:
             self.disconnect()
             return None
 
-        project_id = project['id']
-
         cursor.execute('''
             SELECT run_token, status, pages_scraped, start_time, records_count 
             FROM runs WHERE project_id = ? ORDER BY created_at DESC
@@ -565,10 +1127,11 @@ class ParseHubDatabase:
             (original_run_id, project_id, last_product_url, last_product_name, 
              stopped_timestamp, recovery_triggered_timestamp, status)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 'pending')
+            RETURNING id
         ''', (original_run_id, project_id, last_product_url, last_product_name))
+        recovery_id = cursor.fetchone()['id']
 
         conn.commit()
-        recovery_id = cursor.lastrowid
         self.disconnect()
         return recovery_id
 
@@ -610,7 +1173,7 @@ class ParseHubDatabase:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT data_key, data_value FROM scraped_data 
+            SELECT data_key, data_value FROM scraped_fields 
             WHERE run_id = ? 
             ORDER BY created_at DESC 
             LIMIT 1
@@ -642,7 +1205,7 @@ class ParseHubDatabase:
 
         # Get sample of data
         cursor.execute('''
-            SELECT data_key, data_value FROM scraped_data 
+            SELECT data_key, data_value FROM scraped_fields 
             WHERE run_id = ? 
             ORDER BY created_at DESC 
             LIMIT 5
@@ -667,42 +1230,58 @@ class ParseHubDatabase:
         conn = self.connect()
         cursor = conn.cursor()
 
-        # Try common field names for URLs
+        # Common field names for URLs, in order of preference
         url_fields = ['url', 'product_url', 'link', 'href', 'page_url']
-        
-        for field in url_fields:
-            cursor.execute('''
-                SELECT DISTINCT data_value FROM scraped_data 
-                WHERE run_id = ? AND data_key = ? AND data_value LIKE 'http%'
-                ORDER BY created_at DESC
-            ''', (run_id, field))
-            
-            urls = [row['data_value'] for row in cursor.fetchall()]
-            if urls:
-                self.disconnect()
-                return urls
 
+        cursor.row_factory = None
+        cursor.execute('''
+            SELECT data_key, data_value FROM scraped_fields 
+            WHERE run_id = ? AND data_key IN (?, ?, ?, ?, ?) AND data_value LIKE 'http%'
+            ORDER BY created_at DESC
+        ''', (run_id, *url_fields))
+        rows = cursor.fetchall()
         self.disconnect()
+
+        # Only the first field that has any URLs is used, newest first
+        urls_by_field = {}
+        for data_key, data_value in rows:
+            urls_by_field.setdefault(data_key, {})[data_value] = None
+
+        for field in url_fields:
+            if field in urls_by_field:
+                return list(urls_by_field[field])
+
         return []
 
     def record_data_lineage(self, run_id: int, product_urls: list, recovery_op_id: int = None):
-        """Record which products came from which run for deduplication"""
+        """
+        Record which products came from which run for deduplication.
+        Each URL is linked to the first scraped_data row of the run that
+        holds it; URLs not found in the run's data are skipped
+        """
         conn = self.connect()
         cursor = conn.cursor()
 
-        for url in product_urls:
-            # Create hash of URL for quick duplicate detection
-            import hashlib
-            product_hash = hashlib.md5(url.encode()).hexdigest()
-
+        try:
+            cursor.row_factory = None
             cursor.execute('''
-                INSERT INTO data_lineage 
-                (source_run_id, recovery_operation_id, product_url, product_hash)
-                VALUES (?, ?, ?, ?)
-            ''', (run_id, recovery_op_id, url, product_hash))
+                SELECT data_value, MIN(id) FROM scraped_fields
+                WHERE run_id = ? AND data_value LIKE 'http%'
+                GROUP BY data_value
+            ''', (run_id,))
+            data_ids = dict(cursor.fetchall())
 
-        conn.commit()
-        self.disconnect()
+            # Create hash of URL for quick duplicate detection
+            rows = [
+                (data_ids[url], run_id, recovery_op_id, url, hashlib.md5(url.encode()).hexdigest())
+                for url in product_urls
+                if url in data_ids
+            ]
+
+            cursor.executemany(INSERT_LINEAGE_SQL, rows)
+            conn.commit()
+        finally:
+            self.disconnect()
 
     def get_recovery_status(self, project_id: int) -> dict:
         """Get current recovery status for a project"""
@@ -771,6 +1350,8 @@ class ParseHubDatabase:
 
         latest_run = cursor.fetchone()
 
+        scraping_rate = self._calculate_scraping_rate(cursor, project_id, runs)
+
         # Check for active recovery
         recovery_status = self.get_recovery_status(project_id)
 
@@ -782,20 +1363,23 @@ class ParseHubDatabase:
             'latest_run': dict(latest_run) if latest_run else None,
             'runs_history': runs[:10],  # Last 10 runs
             'recovery_status': recovery_status,
-            'scraping_rate': self._calculate_scraping_rate(runs)
+            'scraping_rate': scraping_rate
         }
 
-    def _calculate_scraping_rate(self, runs: list) -> dict:
+    def _calculate_scraping_rate(self, cursor, project_id: int, runs: list) -> dict:
         """Calculate scraping rate (items per minute)"""
         if not runs or len(runs) < 2:
             return {'items_per_minute': 0, 'estimated_total': 0}
 
-        completed_runs = [r for r in runs if r['duration_seconds'] and r['records_count']]
-        if not completed_runs:
-            return {'items_per_minute': 0, 'estimated_total': 0}
+        # Average of per-run rates over runs that have both a duration and records
+        cursor.execute('''
+            SELECT AVG(records_count * 60.0 / duration_seconds) as avg_rate FROM runs
+            WHERE project_id = ? AND duration_seconds != 0 AND records_count != 0
+        ''', (project_id,))
+        avg_rate = cursor.fetchone()['avg_rate']
 
-        avg_rate = sum(r['records_count'] / (r['duration_seconds'] / 60) 
-                       for r in completed_runs) / len(completed_runs)
+        if avg_rate is None:
+            return {'items_per_minute': 0, 'estimated_total': 0}
         
         # If current run is in progress, estimate total
         current_run = runs[0]
@@ -822,8 +1406,8 @@ class ParseHubDatabase:
             url: Target URL to scrape
             target_pages: Number of pages to scrape
         """
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
             # First, add the project
@@ -834,18 +1418,21 @@ class ParseHubDatabase:
             
             project_id = cursor.lastrowid
             
-            # Store target pages in run_checkpoints
+            # Store target pages in pagination_checkpoints
             cursor.execute('''
-                INSERT INTO run_checkpoints 
+                INSERT INTO pagination_checkpoints 
                 (project_id, checkpoint_type, checkpoint_data, created_at)
                 VALUES (?, 'target_pages', ?, datetime('now'))
+                ON CONFLICT(project_id, checkpoint_type) DO UPDATE SET
+                    checkpoint_data = excluded.checkpoint_data,
+                    created_at = excluded.created_at
             ''', (project_id, json.dumps({
                 'target_pages': target_pages,
                 'url': url,
                 'created_at': datetime.now().isoformat()
             })))
             
-            self.connection.commit()
+            conn.commit()
             return True
         except Exception as e:
             print(f"Error creating project with pages: {e}")
@@ -860,20 +1447,21 @@ class ParseHubDatabase:
         Returns:
             Page number or None if no pages scraped
         """
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
+            # Index tail seek on (project_id, page_number_ext)
             cursor.execute('''
-                SELECT json_extract(data, '$.page_number') as page_number
+                SELECT page_number_ext as page_number
                 FROM scraped_data
-                WHERE project_id = ?
-                ORDER BY CAST(json_extract(data, '$.page_number') AS INTEGER) DESC
+                WHERE project_id = ? AND page_number_ext IS NOT NULL
+                ORDER BY page_number_ext DESC
                 LIMIT 1
             ''', (project_id,))
             
             result = cursor.fetchone()
-            return int(result[0]) if result and result[0] else None
+            return result[0] if result and result[0] else None
         except Exception as e:
             print(f"Error getting last scraped page: {e}")
             return None
@@ -882,8 +1470,8 @@ class ParseHubDatabase:
     
     def get_total_scraped_count(self, project_id: int) -> int:
         """Get total number of records scraped for a project"""
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
             cursor.execute('''
@@ -902,13 +1490,13 @@ class ParseHubDatabase:
     
     def get_target_pages(self, project_id: int) -> Optional[int]:
         """Get the target page count for a project"""
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
             cursor.execute('''
                 SELECT checkpoint_data
-                FROM run_checkpoints
+                FROM pagination_checkpoints
                 WHERE project_id = ? AND checkpoint_type = 'target_pages'
                 ORDER BY created_at DESC
                 LIMIT 1
@@ -936,8 +1524,8 @@ class ParseHubDatabase:
             page_number: Current page number
             data: Scraped data (dict)
         """
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
             # Add page_number to data
@@ -949,18 +1537,31 @@ class ParseHubDatabase:
                 VALUES (?, ?, ?)
             ''', (run_id, project_id, json.dumps(data_with_page)))
             
-            # Update run checkpoint
+            # Update the checkpoint in place, bumping its record count
+            # rather than recounting the project's rows for every record
             cursor.execute('''
-                INSERT OR REPLACE INTO run_checkpoints
-                (project_id, checkpoint_type, checkpoint_data, created_at)
-                VALUES (?, 'last_page', ?, datetime('now'))
-            ''', (project_id, json.dumps({
-                'last_page': page_number,
-                'total_records': self.get_total_scraped_count(project_id),
-                'timestamp': datetime.now().isoformat()
-            })))
+                UPDATE pagination_checkpoints
+                SET checkpoint_data = json_set(checkpoint_data,
+                        '$.last_page', ?,
+                        '$.total_records', json_extract(checkpoint_data, '$.total_records') + 1,
+                        '$.timestamp', ?),
+                    created_at = datetime('now')
+                WHERE project_id = ? AND checkpoint_type = 'last_page'
+            ''', (page_number, datetime.now().isoformat(), project_id))
             
-            self.connection.commit()
+            if cursor.rowcount == 0:
+                # First checkpoint for this project, count once to seed it
+                cursor.execute('''
+                    INSERT INTO pagination_checkpoints
+                    (project_id, checkpoint_type, checkpoint_data, created_at)
+                    VALUES (?, 'last_page', ?, datetime('now'))
+                ''', (project_id, json.dumps({
+                    'last_page': page_number,
+                    'total_records': self.get_total_scraped_count(project_id),
+                    'timestamp': datetime.now().isoformat()
+                })))
+            
+            conn.commit()
             return True
         except Exception as e:
             print(f"Error recording scraped data with page: {e}")
@@ -981,32 +1582,31 @@ class ParseHubDatabase:
                 'completion_percentage': float
             }
         """
-        self.connect()
-        cursor = self.connection.cursor()
+        conn = self.connect()
+        cursor = conn.cursor()
         
         try:
-            # Get last page and target pages
+            # Get last page and target pages; each is a unique-key lookup
             cursor.execute('''
-                SELECT checkpoint_data
-                FROM run_checkpoints
-                WHERE project_id = ? AND checkpoint_type IN ('last_page', 'target_pages')
-                ORDER BY created_at DESC
-            ''', (project_id,))
+                SELECT
+                    (SELECT checkpoint_data FROM pagination_checkpoints
+                     WHERE project_id = :project_id AND checkpoint_type = 'last_page'),
+                    (SELECT checkpoint_data FROM pagination_checkpoints
+                     WHERE project_id = :project_id AND checkpoint_type = 'target_pages')
+            ''', {'project_id': project_id})
             
-            checkpoints = cursor.fetchall()
-            last_page_data = None
-            target_pages_data = None
-            
-            for checkpoint in checkpoints:
-                data = json.loads(checkpoint[0])
-                if 'last_page' in data:
-                    last_page_data = data
-                elif 'target_pages' in data:
-                    target_pages_data = data
+            last_page_json, target_pages_json = cursor.fetchone()
+            last_page_data = json.loads(last_page_json) if last_page_json else None
+            target_pages_data = json.loads(target_pages_json) if target_pages_json else None
             
             last_page = last_page_data['last_page'] if last_page_data else 0
             target_pages = target_pages_data['target_pages'] if target_pages_data else 0
-            total_records = last_page_data.get('total_records', self.get_total_scraped_count(project_id)) if last_page_data else 0
+            
+            total_records = 0
+            if last_page_data:
+                total_records = last_page_data.get('total_records')
+                if total_records is None:
+                    total_records = self.get_total_scraped_count(project_id)
             
             pages_remaining = max(0, target_pages - last_page) if target_pages else 0
             completion_pct = (last_page / target_pages * 100) if target_pages > 0 else 0
@@ -1080,46 +1680,39 @@ class ParseHubDatabase:
         cursor = conn.cursor()
         
         try:
-            update_fields = ['updated_at = CURRENT_TIMESTAMP']
-            update_params = []
-            
-            if status is not None:
-                update_fields.append('status = ?')
-                update_params.append(status)
-            
-            if total_records is not None:
-                update_fields.append('total_records = ?')
-                update_params.append(total_records)
-            
-            if total_pages is not None:
-                update_fields.append('total_pages = ?')
-                update_params.append(total_pages)
-            
-            if progress_percentage is not None:
-                update_fields.append('progress_percentage = ?')
-                update_params.append(progress_percentage)
-            
-            if current_url is not None:
-                update_fields.append('current_url = ?')
-                update_params.append(current_url)
-            
-            if error_message is not None:
-                update_fields.append('error_message = ?')
-                update_params.append(error_message)
+            values = {
+                'status': status,
+                'total_records': total_records,
+                'total_pages': total_pages,
+                'progress_percentage': progress_percentage,
+                'current_url': current_url,
+                'error_message': error_message,
+            }
+            fields = tuple(name for name, value in values.items() if value is not None)
+            finished = status == 'completed' or status == 'failed'
             
-            if status == 'completed' or status == 'failed':
-                update_fields.append('end_time = CURRENT_TIMESTAMP')
+            # Same field set -> same SQL text, so it is built once and
+            # sqlite3's statement cache reuses the prepared statement
+            key = (fields, finished)
+            query = _SESSION_UPDATE_SQL.get(key)
+            if query is None:
+                update_fields = ['updated_at = CURRENT_TIMESTAMP']
+                update_fields.extend(f'{name} = ?' for name in fields)
+                if finished:
+                    update_fields.append('end_time = CURRENT_TIMESTAMP')
+                query = f'''
+                    UPDATE monitoring_sessions 
+                    SET {', '.join(update_fields)}
+                    WHERE id = ?
+                '''
+                _SESSION_UPDATE_SQL[key] = query
             
+            update_params = [values[name] for name in fields]
             update_params.append(session_id)
             
-            query = f'''
-                UPDATE monitoring_sessions 
-                SET {', '.join(update_fields)}
-                WHERE id = ?
-            '''
-            
             cursor.execute(query, tuple(update_params))
             conn.commit()
+            self._invalidate_session_summary(session_id)
             return True
         except Exception as e:
             print(f"Error updating monitoring session: {e}")
@@ -1128,7 +1721,7 @@ class ParseHubDatabase:
             self.disconnect()
 
     def store_scraped_records(self, session_id: int, project_id: int, run_token: str,
-                             records: list, page_number: int) -> int:
+                             records: list, page_number: int) -> Optional[int]:
         """
         Store scraped records from a page with deduplication
         
@@ -1140,41 +1733,36 @@ class ParseHubDatabase:
             page_number: Current page number
         
         Returns:
-            Number of records stored (new records)
+            Number of records stored (new records), or None if the write failed
         """
-        import hashlib
-        
         conn = self.connect()
         cursor = conn.cursor()
         
-        records_stored = 0
-        
         try:
+            rows = []
             for record in records:
                 # Create hash of record data for deduplication
-                record_json = json.dumps(record, sort_keys=True)
-                data_hash = hashlib.md5(record_json.encode()).hexdigest()
-                
-                try:
-                    cursor.execute('''
-                        INSERT INTO scraped_records 
-                        (session_id, project_id, run_token, page_number, data_hash, data_json)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (session_id, project_id, run_token, page_number, data_hash, record_json))
-                    records_stored += 1
-                except sqlite3.IntegrityError:
-                    # Record already exists (duplicate), skip
-                    pass
+                record_json = _dump_record(record, sort_keys=True)
+                rows.append((session_id, project_id, run_token, page_number,
+                             _record_hash(record_json), record_json))
+            
+            # Duplicates are skipped by the unique constraint, so rowcount
+            # is the number of records actually stored
+            cursor.executemany(INSERT_RECORD_SQL, rows)
+            records_stored = cursor.rowcount
             
             conn.commit()
+            if records_stored:
+                self._invalidate_session_summary(session_id)
             return records_stored
         except Exception as e:
             print(f"Error storing scraped records: {e}")
-            return 0
+            return None
         finally:
             self.disconnect()
 
-    def get_session_records(self, session_id: int, limit: int = 100, offset: int = 0) -> list:
+    def get_session_records(self, session_id: int, limit: int = 100, offset: int = 0,
+                            after_id: int = None) -> list:
         """
         Get paginated records from a monitoring session
         
@@ -1182,35 +1770,46 @@ class ParseHubDatabase:
             session_id: Monitoring session ID
             limit: Number of records to fetch
             offset: Number of records to skip
+            after_id: Return records after this record id instead of using
+                offset (keyset paging, constant cost at any depth)
         
         Returns:
             List of records as dicts
         """
         conn = self.connect()
         cursor = conn.cursor()
+        # Bulk read consumed positionally; plain tuples skip the Row wrapper
+        cursor.row_factory = None
         
         try:
-            cursor.execute('''
-                SELECT id, page_number, data_json, created_at
-                FROM scraped_records
-                WHERE session_id = ?
-                ORDER BY created_at ASC
-                LIMIT ? OFFSET ?
-            ''', (session_id, limit, offset))
-            
-            records = cursor.fetchall()
-            result = []
-            
-            for record in records:
-                data = json.loads(record['data_json'])
-                result.append({
-                    'id': record['id'],
-                    'page_number': record['page_number'],
-                    'data': data,
-                    'created_at': record['created_at']
-                })
+            # created_at is always the insert-time default, so rowid order is
+            # already chronological and needs no sort step
+            if after_id is not None:
+                cursor.execute('''
+                    SELECT id, page_number, data_json, created_at
+                    FROM scraped_records
+                    WHERE session_id = ? AND id > ?
+                    ORDER BY id ASC
+                    LIMIT ?
+                ''', (session_id, after_id, limit))
+            else:
+                cursor.execute('''
+                    SELECT id, page_number, data_json, created_at
+                    FROM scraped_records
+                    WHERE session_id = ?
+                    ORDER BY id ASC
+                    LIMIT ? OFFSET ?
+                ''', (session_id, limit, offset))
             
-            return result
+            return [
+                {
+                    'id': record_id,
+                    'page_number': page_number,
+                    'data': json.loads(data_json),
+                    'created_at': created_at
+                }
+                for record_id, page_number, data_json, created_at in cursor
+            ]
         except Exception as e:
             print(f"Error getting session records: {e}")
             return []
@@ -1224,7 +1823,7 @@ class ParseHubDatabase:
         
         try:
             cursor.execute('''
-                SELECT COUNT(*) as total FROM scraped_records WHERE session_id = ?
+                SELECT record_count as total FROM session_record_counts WHERE session_id = ?
             ''', (session_id,))
             
             result = cursor.fetchone()
@@ -1235,45 +1834,73 @@ class ParseHubDatabase:
         finally:
             self.disconnect()
 
+    def _invalidate_session_summary(self, session_id: int):
+        """Drop a cached session summary after the session changes"""
+        with self._summary_lock:
+            self._summary_cache.pop(session_id, None)
+
     def get_session_summary(self, session_id: int) -> dict:
         """
         Get summary of a monitoring session
         
+        Results are cached briefly per session (see SESSION_SUMMARY_TTL)
+        and invalidated when this instance writes to the session.
+        
         Args:
             session_id: Monitoring session ID
         
         Returns:
             Session summary dict with status, counts, timing
         """
+        now = time.monotonic()
+        with self._summary_lock:
+            cached = self._summary_cache.get(session_id)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+        
+        return self._load_session_summary('id = ?', (session_id,))
+
+    def _cache_session_summary(self, summary: dict):
+        """Remember a freshly loaded session summary"""
+        final = summary['status'] in ('completed', 'failed', 'cancelled')
+        ttl = SESSION_SUMMARY_FINAL_TTL if final else SESSION_SUMMARY_TTL
+        with self._summary_lock:
+            if len(self._summary_cache) >= SESSION_SUMMARY_CACHE_SIZE:
+                # Oldest entry first in insertion order
+                self._summary_cache.pop(next(iter(self._summary_cache)))
+            self._summary_cache[summary['session_id']] = (time.monotonic() + ttl, summary)
+
+    def _load_session_summary(self, where: str, params: tuple) -> dict:
+        """
+        Query the newest session matching `where` together with its record
+        counts in one statement, and cache the result
+        """
         conn = self.connect()
         cursor = conn.cursor()
         
         try:
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT id, project_id, run_token, target_pages, status, 
-                       start_time, end_time, total_records, total_pages, 
-                       progress_percentage, current_url, error_message, created_at
-                FROM monitoring_sessions
-                WHERE id = ?
-            ''', (session_id,))
+                       start_time, end_time, progress_percentage,
+                       current_url, error_message, created_at,
+                       (SELECT record_count FROM session_record_counts
+                        WHERE session_id = s.id) as total,
+                       (SELECT COUNT(*) FROM session_pages
+                        WHERE session_id = s.id) as pages,
+                       (SELECT MAX(page_number) FROM session_pages
+                        WHERE session_id = s.id) as max_page
+                FROM monitoring_sessions s
+                WHERE {where}
+                ORDER BY created_at DESC
+                LIMIT 1
+            ''', params)
             
             session = cursor.fetchone()
             
             if not session:
                 return None
             
-            # Get actual record count
-            cursor.execute('''
-                SELECT COUNT(*) as total, 
-                       COUNT(DISTINCT page_number) as pages,
-                       MAX(page_number) as max_page
-                FROM scraped_records
-                WHERE session_id = ?
-            ''', (session_id,))
-            
-            counts = cursor.fetchone()
-            
-            return {
+            summary = {
                 'session_id': session['id'],
                 'project_id': session['project_id'],
                 'run_token': session['run_token'],
@@ -1281,14 +1908,16 @@ class ParseHubDatabase:
                 'status': session['status'],
                 'start_time': session['start_time'],
                 'end_time': session['end_time'],
-                'total_records': counts['total'],
-                'total_pages': counts['pages'] or 0,
-                'max_page_scraped': counts['max_page'],
+                'total_records': session['total'] or 0,
+                'total_pages': session['pages'] or 0,
+                'max_page_scraped': session['max_page'],
                 'progress_percentage': session['progress_percentage'],
                 'current_url': session['current_url'],
                 'error_message': session['error_message'],
                 'created_at': session['created_at']
             }
+            self._cache_session_summary(summary)
+            return dict(summary)
         except Exception as e:
             print(f"Error getting session summary: {e}")
             return None
@@ -1305,46 +1934,82 @@ class ParseHubDatabase:
         Returns:
             CSV string or None if no records
         """
+        if not self.get_session_records_count(session_id):
+            return None
+        
+        try:
+            return ''.join(self.iter_data_as_csv(session_id))
+        except Exception as e:
+            print(f"Error converting to CSV: {e}")
+            return None
+
+    def iter_data_as_csv(self, session_id: int, batch_size: int = 500):
+        """
+        Stream session data as CSV text chunks
+        
+        Yields the header line first, then one chunk per batch of rows
+        fetched from the cursor, so the whole export is never held in memory.
+        Uses its own connection since the caller may consume it lazily.
+        
+        Args:
+            session_id: Monitoring session ID
+            batch_size: Rows fetched per cursor round-trip
+        """
         import csv
         from io import StringIO
         
-        records = self.get_session_records(session_id, limit=1000000, offset=0)
-        
-        if not records:
-            return None
+        conn = sqlite3.connect(self.db_path)
+        self._apply_pragmas(conn)
         
         try:
-            # Get all unique keys across all records
-            all_keys = set()
-            for record in records:
-                if isinstance(record['data'], dict):
-                    all_keys.update(record['data'].keys())
+            cursor = conn.cursor()
             
-            all_keys = sorted(list(all_keys))
+            # Let SQLite collect the data keys so rows are parsed only once
+            cursor.execute('''
+                SELECT DISTINCT je.key
+                FROM scraped_records sr, json_each(sr.data_json) je
+                WHERE sr.session_id = ? AND json_type(sr.data_json) = 'object'
+                ORDER BY je.key
+            ''', (session_id,))
             
             # Add metadata columns
-            columns = ['page_number', 'created_at'] + all_keys
+            columns = ['page_number', 'created_at'] + [row[0] for row in cursor.fetchall()]
             
-            # Create CSV
             output = StringIO()
-            writer = csv.DictWriter(output, fieldnames=columns)
+            writer = csv.DictWriter(output, fieldnames=columns, restval='', extrasaction='ignore')
             writer.writeheader()
+            yield output.getvalue()
             
-            for record in records:
-                row = {
-                    'page_number': record['page_number'],
-                    'created_at': record['created_at']
-                }
+            cursor.execute('''
+                SELECT page_number, created_at, data_json
+                FROM scraped_records
+                WHERE session_id = ?
+                ORDER BY id ASC
+            ''', (session_id,))
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
                 
-                if isinstance(record['data'], dict):
-                    row.update(record['data'])
+                output.seek(0)
+                output.truncate()
                 
-                writer.writerow({k: row.get(k, '') for k in columns})
-            
-            return output.getvalue()
-        except Exception as e:
-            print(f"Error converting to CSV: {e}")
-            return None
+                for page_number, created_at, data_json in rows:
+                    row = {
+                        'page_number': page_number,
+                        'created_at': created_at
+                    }
+                    
+                    data = json.loads(data_json)
+                    if isinstance(data, dict):
+                        row.update(data)
+                    
+                    writer.writerow(row)
+                
+                yield output.getvalue()
+        finally:
+            conn.close()
 
     def get_monitoring_status_for_project(self, project_id: int) -> dict:
         """
@@ -1356,28 +2021,7 @@ class ParseHubDatabase:
         Returns:
             Latest session summary or None
         """
-        conn = self.connect()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT id FROM monitoring_sessions
-                WHERE project_id = ?
-                ORDER BY created_at DESC
-                LIMIT 1
-            ''', (project_id,))
-            
-            session = cursor.fetchone()
-            
-            if not session:
-                return None
-            
-            return self.get_session_summary(session['id'])
-        except Exception as e:
-            print(f"Error getting monitoring status: {e}")
-            return None
-        finally:
-            self.disconnect()
+        return self._load_session_summary('project_id = ?', (project_id,))
 
     def store_analytics_data(self, project_token: str, run_token: str, analytics_data: dict, records: list, csv_data: str = None):
         """Store analytics data and records to database"""
@@ -1414,24 +2058,21 @@ class ParseHubDatabase:
                 ''', (
                     project_token,
                     run_token,
-                    csv_data,
+                    _compress_text(csv_data),
                     len(records),
                     datetime.now().isoformat()
                 ))
             
             # Store individual records
-            for idx, record in enumerate(records):
-                record_json = json.dumps(record) if isinstance(record, dict) else str(record)
-                cursor.execute('''
-                    INSERT OR REPLACE INTO analytics_records
-                    (project_token, run_token, record_index, record_data)
-                    VALUES (?, ?, ?, ?)
-                ''', (
-                    project_token,
-                    run_token,
-                    idx,
-                    record_json
-                ))
+            cursor.executemany('''
+                INSERT OR REPLACE INTO analytics_records
+                (project_token, run_token, record_index, record_data)
+                VALUES (?, ?, ?, ?)
+            ''', (
+                (project_token, run_token, idx,
+                 _dump_record(record) if isinstance(record, dict) else str(record))
+                for idx, record in enumerate(records)
+            ))
             
             conn.commit()
             self.disconnect()
@@ -1476,9 +2117,10 @@ class ParseHubDatabase:
             
             csv_row = cursor.fetchone()
             if csv_row and csv_row['csv_data']:
-                analytics['csv_data'] = csv_row['csv_data']
+                analytics['csv_data'] = _decompress_text(csv_row['csv_data'])
             
-            # Get records
+            # Get records as plain tuples (no Row wrapper per record)
+            cursor.row_factory = None
             cursor.execute('''
                 SELECT record_data FROM analytics_records
                 WHERE project_token = ?
@@ -1486,11 +2128,11 @@ class ParseHubDatabase:
             ''', (project_token,))
             
             records = []
-            for row in cursor.fetchall():
+            for (record_data,) in cursor.fetchall():
                 try:
-                    records.append(json.loads(row['record_data']))
+                    records.append(json.loads(record_data))
                 except:
-                    records.append(row['record_data'])
+                    records.append(record_data)
             
             if records:
                 analytics['raw_data'] = records
@@ -5,7 +5,7 @@ Called by the frontend API to show real-time progress.
 """
 
 import sys
-import json
+import orjson
 import sqlite3
 import os
 from datetime import datetime
@@ -16,63 +16,66 @@ sys.path.insert(0, backend_dir)
 
 from scraping_session_service import ScrapingSessionService
 
+def write_json(obj) -> None:
+    """Write obj to stdout as one JSON line."""
+    sys.stdout.buffer.write(orjson.dumps(obj) + b'\n')
+    sys.stdout.flush()
+
+# Average ParseHub run takes ~3 minutes
+MINUTES_PER_RUN = 3
+
 def calculate_estimated_time(completed_runs: int, total_runs: int) -> str:
     """Calculate estimated remaining time based on completed runs."""
-    remaining_runs = total_runs - completed_runs
-    minutes_per_run = 3  # Average ParseHub run takes ~3 minutes
-    total_minutes = remaining_runs * minutes_per_run
+    total_minutes = (total_runs - completed_runs) * MINUTES_PER_RUN
     
     if total_minutes <= 0:
         return '< 1 minute'
     if total_minutes < 60:
         return f'{total_minutes} minutes'
     
-    hours = total_minutes // 60
-    minutes = total_minutes % 60
+    hours, minutes = divmod(total_minutes, 60)
     return f'{hours}h {minutes}m'
 
-def get_session_progress(session_id: int) -> dict:
+def get_session_progress(session_id: int, session_service: ScrapingSessionService = None) -> dict:
     """Fetch and format session progress."""
     try:
-        session_service = ScrapingSessionService()
+        if session_service is None:
+            session_service = ScrapingSessionService()
         
-        # Get session details
+        # Session details and its iteration runs in one query; the LEFT JOIN
+        # yields one row with NULL run columns when there are no runs yet
         conn = session_service.db.connect()
         cursor = conn.cursor()
+        cursor.row_factory = None
         
-        # Fetch session details
         cursor.execute('''
-            SELECT id, project_token, project_name, total_pages_target, 
-                   pages_completed, current_iteration, status, created_at
-            FROM scraping_sessions WHERE id = ?
+            SELECT s.id, s.project_name, s.total_pages_target, s.pages_completed,
+                   s.current_iteration, s.status,
+                   r.id, r.iteration_number, r.start_page_number, r.end_page_number,
+                   r.records_count, r.status, r.completed_at
+            FROM scraping_sessions s
+            LEFT JOIN iteration_runs r ON r.session_id = s.id
+            WHERE s.id = ?
+            ORDER BY r.iteration_number
         ''', (session_id,))
         
-        session = cursor.fetchone()
-        if not session:
-            return {'error': 'Session not found'}
-        
-        session_id, project_token, project_name, total_pages_target, pages_completed, current_iteration, status, created_at = session
+        rows = cursor.fetchall()
+        session_service.db.disconnect()
         
-        # Fetch all iteration runs
-        cursor.execute('''
-            SELECT id, iteration_number, parsehub_project_name, start_page_number,
-                   end_page_number, records_count, status, completed_at
-            FROM iteration_runs WHERE session_id = ?
-            ORDER BY iteration_number
-        ''', (session_id,))
+        if not rows:
+            return {'error': 'Session not found'}
         
-        runs = cursor.fetchall()
-        conn.close()
+        session_id, project_name, total_pages_target, pages_completed, current_iteration, status = rows[0][:6]
         
-        # Calculate derived values
-        total_iterations_needed = (total_pages_target + 9) // 10  # Ceiling division
-        percentage = round((pages_completed / total_pages_target * 100)) if total_pages_target > 0 else 0
-        iterations_completed = sum(1 for r in runs if r[6] == 'completed')
-        
-        # Format runs
+        # Format runs, counting completed iterations along the way
         formatted_runs = []
-        for run in runs:
-            run_id, iteration_number, project_name_run, start_page, end_page, records_count, run_status, completed_at = run
+        iterations_completed = 0
+        for row in rows:
+            run_id, iteration_number, start_page, end_page, records_count, run_status, completed_at = row[6:]
+            if run_id is None:
+                continue
+            if run_status == 'completed':
+                iterations_completed += 1
             formatted_runs.append({
                 'iteration': iteration_number,
                 'pages': f'{start_page}-{end_page}',
@@ -81,6 +84,10 @@ def get_session_progress(session_id: int) -> dict:
                 'completed_at': completed_at
             })
         
+        # Calculate derived values
+        total_iterations_needed = (total_pages_target + 9) // 10  # Ceiling division
+        percentage = round((pages_completed / total_pages_target * 100)) if total_pages_target > 0 else 0
+        
         # Build response
         progress = {
             'session_id': session_id,
@@ -108,28 +115,28 @@ def get_session_progress(session_id: int) -> dict:
 if __name__ == '__main__':
     try:
         # Read input from stdin
-        input_data = sys.stdin.read()
+        input_data = sys.stdin.buffer.read()
         if not input_data:
-            print(json.dumps({'error': 'No input provided', 'success': False}))
+            write_json({'error': 'No input provided', 'success': False})
             sys.exit(0)  # Exit 0 to allow frontend to handle the error
         
-        data = json.loads(input_data)
+        data = orjson.loads(input_data)
         session_id = data.get('session_id')
         
         if not session_id:
-            print(json.dumps({'error': 'session_id required', 'success': False}))
+            write_json({'error': 'session_id required', 'success': False})
             sys.exit(0)
         
         # Get progress
         progress = get_session_progress(session_id)
         
         # Output as JSON to stdout
-        print(json.dumps(progress))
+        write_json(progress)
         sys.exit(0)
         
-    except json.JSONDecodeError as e:
-        print(json.dumps({'error': f'Invalid JSON input: {str(e)}', 'success': False}))
+    except orjson.JSONDecodeError as e:
+        write_json({'error': f'Invalid JSON input: {str(e)}', 'success': False})
         sys.exit(0)
     except Exception as e:
-        print(json.dumps({'error': str(e), 'success': False}))
+        write_json({'error': str(e), 'success': False})
         sys.exit(0)
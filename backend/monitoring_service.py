@@ -3,9 +3,13 @@ Monitoring Service - Continuously monitors projects for stops and triggers auto-
 """
 
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -22,6 +26,18 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Project status checks are independent HTTP round-trips; run this many at once
+# (matches the HTTP session's pool_maxsize)
+MAX_CHECK_WORKERS = 16
+
+# Records requested per ParseHub data call; also the unit stored as one "page"
+RUN_DATA_PAGE_SIZE = 100
+
+# Real-time polling: start at 2s and back off while the run shows no progress
+POLL_INTERVAL_SECONDS = 2
+MAX_POLL_INTERVAL_SECONDS = 30
+POLL_BACKOFF_FACTOR = 1.2
+
 
 class MonitoringService:
     def __init__(self):
@@ -34,7 +50,29 @@ class MonitoringService:
         self.check_interval = int(os.getenv('MONITOR_CHECK_INTERVAL', '60'))  # seconds
         self.monitored_projects = {}
         self.recovery_attempts = {}  # Track recovery attempts
+        self._recovery_lock = threading.Lock()
         self.max_recovery_attempts = int(os.getenv('MAX_RECOVERY_ATTEMPTS', '3'))
+        self.session = self._create_http_session()
+        # Sent with every ParseHub call; per-call params are merged on top
+        self.session.params = {'api_key': self.api_key}
+
+    @staticmethod
+    def _create_http_session() -> requests.Session:
+        """HTTP session with keep-alive pooling and retries for transient ParseHub errors"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=MAX_CHECK_WORKERS,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
     def start(self):
         """Start the monitoring service"""
@@ -51,47 +89,47 @@ class MonitoringService:
         )
 
         self.scheduler.start()
-        logger.info(f"[OK] Monitoring Service started (check interval: {self.check_interval}s)")
+        logger.info("[OK] Monitoring Service started (check interval: %ss)", self.check_interval)
 
     def stop(self):
         """Stop the monitoring service"""
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("[OK] Monitoring Service stopped")
+        self.session.close()
 
     def get_all_projects(self) -> List[Dict]:
         """Get all projects from ParseHub"""
         try:
-            response = requests.get(
-                f"{self.base_url}/projects",
-                params={'api_key': self.api_key},
-                timeout=10
-            )
+            response = self.session.get(f"{self.base_url}/projects", timeout=10)
 
             if response.status_code == 200:
-                return response.json().get('projects', [])
+                return orjson.loads(response.content).get('projects', [])
 
             return []
 
         except Exception as e:
-            logger.error(f"Error fetching projects: {e}")
+            logger.error("Error fetching projects: %s", e)
             return []
 
     def check_all_projects(self):
         """Check status of all projects"""
         try:
             projects = self.get_all_projects()
-            logger.info(f"Checking {len(projects)} projects...")
+            logger.info("Checking %s projects...", len(projects))
 
-            for project in projects:
-                project_token = project.get('token')
-                if not project_token:
-                    continue
+            projects = [project for project in projects if project.get('token')]
+            if not projects:
+                return
 
-                self.check_single_project(project_token, project)
+            with ThreadPoolExecutor(max_workers=min(MAX_CHECK_WORKERS, len(projects))) as executor:
+                list(executor.map(
+                    lambda project: self.check_single_project(project['token'], project),
+                    projects
+                ))
 
         except Exception as e:
-            logger.error(f"Error in check_all_projects: {e}")
+            logger.error("Error in check_all_projects: %s", e)
 
     def check_single_project(self, project_token: str, project_data: Dict = None):
         """Check if a single project needs recovery"""
@@ -99,14 +137,14 @@ class MonitoringService:
             status_check = self.recovery_service.check_project_status(project_token)
             status = status_check.get('status')
 
-            logger.debug(f"Project {project_token}: {status}")
+            logger.debug("Project %s: %s", project_token, status)
 
             # Check if project should be recovered
             if status in ['stuck', 'cancelled'] or (status == 'completed' and self._is_incomplete_run(project_data)):
                 self._handle_stop_detected(project_token, status, status_check)
 
         except Exception as e:
-            logger.error(f"Error checking project {project_token}: {e}")
+            logger.error("Error checking project %s: %s", project_token, e)
 
     def _is_incomplete_run(self, project_data: Dict) -> bool:
         """Check if a completed run looks incomplete"""
@@ -122,16 +160,14 @@ class MonitoringService:
 
     def _handle_stop_detected(self, project_token: str, stop_reason: str, status_check: Dict):
         """Handle when a project stop is detected"""
-        logger.warning(f"🛑 Project {project_token} stopped: {stop_reason}")
+        logger.warning("🛑 Project %s stopped: %s", project_token, stop_reason)
 
         # Check if already in recovery or hit max attempts
-        if project_token in self.recovery_attempts:
-            attempt_count = self.recovery_attempts[project_token]
-            if attempt_count >= self.max_recovery_attempts:
-                logger.warning(f"Max recovery attempts ({self.max_recovery_attempts}) reached for {project_token}")
-                return
-        else:
-            self.recovery_attempts[project_token] = 0
+        with self._recovery_lock:
+            attempt_count = self.recovery_attempts.setdefault(project_token, 0)
+        if attempt_count >= self.max_recovery_attempts:
+            logger.warning("Max recovery attempts (%s) reached for %s", self.max_recovery_attempts, project_token)
+            return
 
         # Trigger auto-recovery
         self.trigger_recovery(project_token)
@@ -139,20 +175,21 @@ class MonitoringService:
     def trigger_recovery(self, project_token: str) -> Dict:
         """Trigger recovery for a project"""
         try:
-            logger.info(f"🔄 Triggering recovery for project {project_token}...")
+            logger.info("🔄 Triggering recovery for project %s...", project_token)
 
             result = self.recovery_service.trigger_auto_recovery(project_token)
 
             if result.get('success'):
-                self.recovery_attempts[project_token] = self.recovery_attempts.get(project_token, 0) + 1
-                logger.info(f"[OK] Recovery triggered successfully: {result.get('message')}")
+                with self._recovery_lock:
+                    self.recovery_attempts[project_token] = self.recovery_attempts.get(project_token, 0) + 1
+                logger.info("[OK] Recovery triggered successfully: %s", result.get('message'))
             else:
-                logger.error(f"[ERROR] Recovery failed: {result.get('message')}")
+                logger.error("[ERROR] Recovery failed: %s", result.get('message'))
 
             return result
 
         except Exception as e:
-            logger.error(f"Error triggering recovery: {e}")
+            logger.error("Error triggering recovery: %s", e)
             return {'success': False, 'message': str(e)}
 
     def get_monitoring_status(self) -> Dict:
@@ -162,14 +199,15 @@ class MonitoringService:
             'check_interval_seconds': self.check_interval,
             'stop_detection_minutes': self.stop_detection_minutes,
             'max_recovery_attempts': self.max_recovery_attempts,
-            'recovery_attempts': self.recovery_attempts
+            'recovery_attempts': dict(self.recovery_attempts)
         }
 
     def reset_recovery_counter(self, project_token: str):
         """Reset recovery attempt counter for a project"""
-        if project_token in self.recovery_attempts:
-            del self.recovery_attempts[project_token]
-            logger.info(f"Reset recovery counter for {project_token}")
+        with self._recovery_lock:
+            removed = self.recovery_attempts.pop(project_token, None)
+        if removed is not None:
+            logger.info("Reset recovery counter for %s", project_token)
 
     # ==================== REAL-TIME DATA MONITORING ====================
     
@@ -190,28 +228,41 @@ class MonitoringService:
             session_id = self.db.create_monitoring_session(project_id, run_token, target_pages)
             
             if not session_id:
-                logger.error(f"Failed to create monitoring session for {run_token}")
+                logger.error("Failed to create monitoring session for %s", run_token)
                 return {'error': 'Failed to create session'}
             
-            logger.info(f"📊 Started monitoring run {run_token} (session: {session_id})")
+            logger.info("📊 Started monitoring run %s (session: %s)", run_token, session_id)
             
             # Monitor until completion
             poll_count = 0
+            unchanged_polls = 0
+            last_data_count = None
             while True:
                 # Get current run status
-                status_data = self.get_run_status(run_token)
+                status_data = self.get_run_status(run_token, target_pages)
                 
                 if not status_data:
-                    logger.warning(f"[WARNING] Could not get status for run {run_token}")
-                    time.sleep(2)
+                    logger.warning("[WARNING] Could not get status for run %s", run_token)
+                    time.sleep(POLL_INTERVAL_SECONDS)
                     continue
                 
-                # Fetch and store new data
-                new_records = self.fetch_and_store_data(session_id, project_id, run_token)
-                
-                # Update session with current status
                 current_status = status_data.get('status', 'running')
                 total_records = status_data.get('data_count', 0)
+                finished = current_status in ['succeeded', 'failed', 'cancelled']
+                
+                # Fetch and store new data, only when the run has produced some.
+                # Resume from the last fully stored page; a partial page is
+                # fetched again and its repeats are dropped by deduplication
+                if total_records != last_data_count or finished:
+                    stored = self.db.get_session_records_count(session_id)
+                    offset = (stored // RUN_DATA_PAGE_SIZE) * RUN_DATA_PAGE_SIZE
+                    self.fetch_and_store_data(session_id, project_id, run_token, offset)
+                    unchanged_polls = 0
+                else:
+                    unchanged_polls += 1
+                last_data_count = total_records
+                
+                # Update session with current status
                 total_pages = status_data.get('pages_crawled', 0)
                 progress_pct = status_data.get('progress_percentage', 0)
                 current_url = status_data.get('current_url', '')
@@ -226,11 +277,11 @@ class MonitoringService:
                 )
                 
                 poll_count += 1
-                logger.info(f"📈 Poll #{poll_count}: {total_records} records, {total_pages}/{target_pages} pages")
+                logger.info("📈 Poll #%s: %s records, %s/%s pages", poll_count, total_records, total_pages, target_pages)
                 
                 # Check if completed
-                if current_status in ['succeeded', 'failed', 'cancelled']:
-                    logger.info(f"[OK] Run {run_token} {current_status}")
+                if finished:
+                    logger.info("[OK] Run %s %s", run_token, current_status)
                     # Final update
                     self.db.update_monitoring_session(
                         session_id,
@@ -241,19 +292,20 @@ class MonitoringService:
                     )
                     break
                 
-                # Wait before next poll
-                time.sleep(2)
+                # Wait before next poll, backing off while nothing changes
+                time.sleep(min(MAX_POLL_INTERVAL_SECONDS,
+                               POLL_INTERVAL_SECONDS * POLL_BACKOFF_FACTOR ** unchanged_polls))
             
             # Get final session data
             final_status = self.db.get_session_summary(session_id)
             return final_status if final_status else {'error': 'No data available', 'session_id': session_id}
             
         except Exception as e:
-            logger.error(f"[ERROR] Error monitoring run: {e}")
+            logger.error("[ERROR] Error monitoring run: %s", e)
             return {'error': str(e)}
     
     def fetch_and_store_data(self, session_id: str, project_id: int, run_token: str, 
-                            offset: int = 0, limit: int = 100) -> int:
+                            offset: int = 0, limit: int = RUN_DATA_PAGE_SIZE) -> int:
         """
         Fetch paginated data from ParseHub and store to database
         
@@ -267,70 +319,77 @@ class MonitoringService:
         Returns:
             Count of newly stored records
         """
+        url = f'{self.base_url}/runs/{run_token}/data'
+        stored_count = 0
+        
         try:
-            # Fetch from ParseHub
-            url = f'{self.base_url}/runs/{run_token}/data'
-            params = {
-                'api_key': self.api_key,
-                'offset': offset,
-                'limit': limit
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            records = data.get('data', [])
-            total = data.get('total_count', 0)
-            
-            if not records:
-                return 0
-            
-            # Store records
-            page_number = (offset // limit) + 1
-            stored_count = self.db.store_scraped_records(
-                session_id, project_id, run_token, records, page_number
-            )
-            
-            # If more data exists, recursively fetch next chunk
-            if offset + limit < total:
-                stored_count += self.fetch_and_store_data(
-                    session_id, project_id, run_token,
-                    offset + limit, limit
+            while True:
+                # Fetch from ParseHub
+                params = {
+                    'offset': offset,
+                    'limit': limit
+                }
+                
+                response = self.session.get(url, params=params, timeout=10)
+                response.raise_for_status()
+                
+                data = orjson.loads(response.content)
+                records = data.get('data', [])
+                total = data.get('total_count', 0)
+                
+                if not records:
+                    break
+                
+                # Store records
+                page_number = (offset // limit) + 1
+                stored = self.db.store_scraped_records(
+                    session_id, project_id, run_token, records, page_number
                 )
+                if stored is None:
+                    logger.warning("[WARNING] Failed to store page %s; stopping fetch", page_number)
+                    break
+                stored_count += stored
+                
+                # Continue while more data exists
+                offset += limit
+                if offset >= total:
+                    break
             
             return stored_count
             
         except Exception as e:
-            logger.warning(f"[WARNING] Error fetching data: {e}")
-            return 0
+            logger.warning("[WARNING] Error fetching data: %s", e)
+            return stored_count
     
-    def get_run_status(self, run_token: str) -> Optional[Dict]:
+    def get_run_status(self, run_token: str, target_pages: int = None) -> Optional[Dict]:
         """
         Get current status of a ParseHub run
         
+        Args:
+            run_token: Run token
+            target_pages: Pages the run is expected to crawl, for the progress percentage
+        
         Returns:
             Dict with status, data_count, pages_crawled, progress_percentage
         """
         try:
             url = f'{self.base_url}/runs/{run_token}'
-            params = {'api_key': self.api_key}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             return {
                 'status': data.get('status', 'unknown'),
                 'data_count': data.get('data_count', 0),
                 'pages_crawled': data.get('pages_crawled', 0),
-                'progress_percentage': self._calculate_progress(data),
+                'progress_percentage': self._calculate_progress(data, target_pages),
                 'current_url': data.get('page_crawled_url', ''),
                 'error': data.get('error_log', '')
             }
         except Exception as e:
-            logger.warning(f"[WARNING] Error getting run status: {e}")
+            logger.warning("[WARNING] Error getting run status: %s", e)
             return None
     
     def get_monitoring_status_for_project(self, project_id: int) -> Optional[Dict]:
@@ -344,15 +403,22 @@ class MonitoringService:
             summary = self.db.get_monitoring_status_for_project(project_id)
             return summary
         except Exception as e:
-            logger.warning(f"[WARNING] Error getting monitoring status: {e}")
+            logger.warning("[WARNING] Error getting monitoring status: %s", e)
             return None
     
-    def _calculate_progress(self, data: Dict) -> float:
-        """Calculate progress percentage from run data"""
+    def _calculate_progress(self, data: Dict, target_pages: int = None) -> float:
+        """
+        Calculate progress percentage from run data
+        
+        Capped at 99 while the run is still going; monitor_run_realtime
+        records 100 once ParseHub reports success.
+        """
         try:
             pages_crawled = data.get('pages_crawled', 0)
             if pages_crawled > 0:
-                # Estimate based on pages (simplified)
+                if target_pages:
+                    return min(int(100 * pages_crawled / target_pages), 99)
+                # No target known: rough estimate based on pages
                 return min(int(pages_crawled * 10), 99)
             return 0
         except:
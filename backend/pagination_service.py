@@ -5,15 +5,52 @@ Pagination Service - Handles pagination detection, URL generation, and recovery
 import re
 import sqlite3
 import json
+import threading
 from datetime import datetime
 from typing import Dict, Optional, Tuple
 
+# Page-number patterns, in precedence order: ?page=N, ?p=N, /page/N or /page-N, ?offset=N
+_PAGE_NUMBER_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'[?&]page[=](\d+)',
+        r'[?&]p[=](\d+)',
+        r'/page[/-](\d+)',
+        r'[?&]offset[=](\d+)',
+    )
+]
+
+# Same forms with the prefix captured, for rewriting to the next page
+_NEXT_PAGE_PATTERNS = [
+    (re.compile(r'([?&]page[=])\d+'), 'query'),
+    (re.compile(r'([?&]p[=])\d+'), 'query'),
+    (re.compile(r'(/page[/-])\d+'), 'path'),
+    (re.compile(r'([?&]offset[=])\d+'), 'offset'),
+]
+
+_PAGINATION_PATTERNS = {
+    'query_page': re.compile(r'[?&]page[=]\d+'),
+    'query_p': re.compile(r'[?&]p[=]\d+'),
+    'path_style': re.compile(r'/page[/-]\d+'),
+    'offset': re.compile(r'[?&]offset[=]\d+')
+}
+
 
 class PaginationService:
     """Service for managing pagination and automatic recovery"""
     
     def __init__(self, db_path: str = "parsehub.db"):
         self.db_path = db_path
+        self._local = threading.local()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opened on first use and kept for reuse"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+        return conn
     
     def extract_page_number(self, url: str) -> int:
         """
@@ -23,15 +60,8 @@ class PaginationService:
         if not url:
             return 1
         
-        patterns = [
-            r'[?&]page[=](\d+)',
-            r'[?&]p[=](\d+)',
-            r'/page[/-](\d+)',
-            r'[?&]offset[=](\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url, re.IGNORECASE)
+        for pattern in _PAGE_NUMBER_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return int(match.group(1))
         
@@ -43,16 +73,11 @@ class PaginationService:
         """
         next_page = current_page + 1
         
-        patterns = [
-            (r'([?&]page[=])\d+', rf'\g<1>{next_page}', 'query'),
-            (r'([?&]p[=])\d+', rf'\g<1>{next_page}', 'query'),
-            (r'(/page[/-])\d+', rf'\g<1>{next_page}', 'path'),
-            (r'([?&]offset[=])\d+', rf'\g<1>{current_page * 20}', 'offset'),
-        ]
-        
-        for pattern, replacement, style in patterns:
-            if re.search(pattern, base_url):
-                return re.sub(pattern, replacement, base_url)
+        for pattern, style in _NEXT_PAGE_PATTERNS:
+            value = current_page * 20 if style == 'offset' else next_page
+            next_url, replaced = pattern.subn(rf'\g<1>{value}', base_url)
+            if replaced:
+                return next_url
         
         # Default: append page parameter
         separator = '&' if '?' in base_url else '?'
@@ -60,16 +85,9 @@ class PaginationService:
     
     def detect_pagination_pattern(self, url: str) -> Dict:
         """Detect pagination pattern in URL"""
-        patterns = {
-            'query_page': r'[?&]page[=]\d+',
-            'query_p': r'[?&]p[=]\d+',
-            'path_style': r'/page[/-]\d+',
-            'offset': r'[?&]offset[=]\d+'
-        }
-        
         detected = {}
-        for pattern_name, pattern in patterns.items():
-            if re.search(pattern, url):
+        for pattern_name, pattern in _PAGINATION_PATTERNS.items():
+            if pattern.search(url):
                 detected[pattern_name] = True
         
         return detected
@@ -87,13 +105,12 @@ class PaginationService:
                 'pages_remaining': int
             }
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connect().cursor()
         
-        # Get last page number from data
+        # Get last page number from data; page_number_ext is the generated
+        # column ParseHubDatabase indexes with project_id, so this is a seek
         cursor.execute('''
-            SELECT MAX(CAST(json_extract(data, '$.page_number') AS INTEGER)) as last_page
+            SELECT MAX(page_number_ext) as last_page
             FROM scraped_data 
             WHERE project_id = ?
         ''', (project_id,))
@@ -109,8 +126,6 @@ class PaginationService:
         
         total_count = cursor.fetchone()['total'] or 0
         
-        conn.close()
-        
         return {
             'needs_recovery': last_page < target_pages,
             'last_page_scraped': last_page,
@@ -138,22 +153,20 @@ class PaginationService:
     def record_scraping_progress(self, project_id: int, page_number: int, 
                                 data_count: int, items_per_minute: float) -> None:
         """Record scraping progress checkpoint"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO run_checkpoints
-            (run_id, snapshot_timestamp, item_count_at_time, items_per_minute)
-            VALUES (
-                (SELECT id FROM runs WHERE project_id = ? ORDER BY created_at DESC LIMIT 1),
-                CURRENT_TIMESTAMP,
-                ?,
-                ?
-            )
-        ''', (project_id, data_count, items_per_minute))
-        
-        conn.commit()
-        conn.close()
+        conn = self._connect()
+        
+        # Commits on success, rolls back on error; the connection stays open
+        with conn:
+            conn.execute('''
+                INSERT INTO run_checkpoints
+                (run_id, snapshot_timestamp, item_count_at_time, items_per_minute)
+                VALUES (
+                    (SELECT id FROM runs WHERE project_id = ? ORDER BY created_at DESC LIMIT 1),
+                    CURRENT_TIMESTAMP,
+                    ?,
+                    ?
+                )
+            ''', (project_id, data_count, items_per_minute))
 
 
 class PaginationDetector:
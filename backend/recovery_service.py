@@ -247,7 +247,7 @@ class RecoveryService:
 
             # Get URLs from original run
             cursor.execute('''
-                SELECT DISTINCT data_value FROM scraped_data 
+                SELECT DISTINCT data_value FROM scraped_fields 
                 WHERE run_id = ? AND data_key IN ('url', 'product_url')
             ''', (original_run_id,))
             
@@ -255,7 +255,7 @@ class RecoveryService:
 
             # Get URLs from recovery run
             cursor.execute('''
-                SELECT DISTINCT data_value FROM scraped_data 
+                SELECT DISTINCT data_value FROM scraped_fields 
                 WHERE run_id = ? AND data_key IN ('url', 'product_url')
             ''', (recovery_run_id,))
             
@@ -274,10 +274,6 @@ class RecoveryService:
 
             total_unique = original_count + len(new_items)
 
-            conn.commit()
-            cursor.close()
-            self.db.disconnect()
-
             return {
                 'original_count': original_count,
                 'recovery_count': recovery_count,
@@ -290,6 +286,8 @@ class RecoveryService:
         except Exception as e:
             print(f"Error deduplicating data: {e}")
             return {'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def trigger_auto_recovery(self, project_token: str) -> Dict:
         """
@@ -302,29 +300,27 @@ class RecoveryService:
         try:
             # Get project ID
             conn = self.db.connect()
-            cursor = conn.cursor()
-            cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
-            project = cursor.fetchone()
-            
-            if not project:
-                return {'success': False, 'message': 'Project not found'}
-
-            project_id = project['id']
-            conn.close()
-            self.db.disconnect()
-
-            # Get latest run
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, run_token FROM runs 
-                WHERE project_id = ? 
-                ORDER BY created_at DESC 
-                LIMIT 1
-            ''', (project_id,))
-            
-            latest_run = cursor.fetchone()
-            conn.close()
-            self.db.disconnect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute('SELECT id FROM projects WHERE token = ?', (project_token,))
+                project = cursor.fetchone()
+
+                if not project:
+                    return {'success': False, 'message': 'Project not found'}
+
+                project_id = project['id']
+
+                # Get latest run
+                cursor.execute('''
+                    SELECT id, run_token FROM runs 
+                    WHERE project_id = ? 
+                    ORDER BY created_at DESC 
+                    LIMIT 1
+                ''', (project_id,))
+
+                latest_run = cursor.fetchone()
+            finally:
+                self.db.disconnect()
 
             if not latest_run:
                 return {'success': False, 'message': 'No previous runs found'}
@@ -57,6 +57,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error creating session: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def get_session(self, session_id: int):
         """Get session details"""
@@ -89,6 +91,8 @@ class ScrapingSessionService:
             return {'success': False, 'error': 'Session not found'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def add_iteration_run(self, session_id: int, iteration_number: int,
                          parsehub_project_token: str, parsehub_project_name: str,
@@ -120,6 +124,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error adding iteration run: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def update_iteration_run(self, run_id: int, csv_data: str, records_count: int, status: str):
         """Update iteration run with results"""
@@ -140,6 +146,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error updating iteration run: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def get_session_runs(self, session_id: int):
         """Get all iteration runs for a session"""
@@ -163,6 +171,8 @@ class ScrapingSessionService:
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def update_session_progress(self, session_id: int, pages_completed: int, status: str):
         """Update session progress"""
@@ -182,6 +192,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error updating session progress: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def mark_session_complete(self, session_id: int):
         """Mark session as complete"""
@@ -201,6 +213,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error marking session complete: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def save_combined_data(self, session_id: int, consolidated_csv: str, 
                           total_records: int, total_pages: int, deduplicated_count: int):
@@ -221,6 +235,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error saving combined data: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def get_combined_data(self, session_id: int):
         """Get consolidated data for a session"""
@@ -246,6 +262,8 @@ class ScrapingSessionService:
             return {'success': False, 'error': 'No combined data found'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def save_url_pattern(self, project_token: str, original_url: str, pattern_type: str,
                         pattern_regex: str, placeholder: str):
@@ -266,6 +284,8 @@ class ScrapingSessionService:
         except Exception as e:
             print(f"[ERROR] Error saving URL pattern: {str(e)}", file=sys.stderr)
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
 
     def get_url_pattern(self, project_token: str):
         """Get stored URL pattern for a project"""
@@ -290,3 +310,5 @@ class ScrapingSessionService:
             return {'success': False, 'error': 'No pattern found'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
+        finally:
+            self.db.disconnect()
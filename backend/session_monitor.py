@@ -4,13 +4,69 @@ Continuously monitors database for active scraping sessions
 and executes incremental scraping operations
 """
 
+import os
 import sys
 import time
+import socket
+import sqlite3
+import tempfile
 import threading
 import json
+import logging
+from logging.handlers import MemoryHandler
+from concurrent.futures import ThreadPoolExecutor
 from scraping_session_service import ScrapingSessionService
 from auto_runner_service import AutoRunnerService
 
+# Records are buffered and written to stderr in batches of 100, or at once on
+# an error; MONITOR_LOG_LEVEL=DEBUG turns on the per-tick chatter
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv('MONITOR_LOG_LEVEL', 'INFO').upper())
+if not logger.handlers:
+    _stderr_handler = logging.StreamHandler(sys.stderr)
+    _stderr_handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(MemoryHandler(capacity=100, flushLevel=logging.ERROR, target=_stderr_handler))
+    logger.propagate = False
+
+# Append-only log written by start_incremental_scraping.save_session_url, one
+# JSON line per session; compacted once it passes SESSION_URLS_COMPACT_BYTES
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SESSION_URLS_FILE = os.path.join(PROJECT_ROOT, 'session_urls.jsonl')
+SESSION_URLS_COMPACT_BYTES = 1024 * 1024
+
+# Sessions saved before the log existed, still read for their URLs
+LEGACY_SESSION_URLS_FILE = os.path.join(PROJECT_ROOT, 'session_urls.json')
+
+# The running monitor records its PID here and listens for new-session
+# datagrams on the socket (POSIX only; Windows relies on the URL file's mtime)
+MONITOR_PID_FILE = os.path.join(tempfile.gettempdir(), 'parsehub-monitor.pid')
+MONITOR_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'parsehub-monitor.sock')
+USE_CONTROL_SOCKET = os.name != 'nt' and hasattr(socket, 'AF_UNIX')
+
+# Idle polling backs off from MIN to MAX seconds while no sessions are running
+MIN_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 30.0
+
+# Sessions processed concurrently; bounded to keep ParseHub API load in check
+MAX_SESSION_WORKERS = 4
+
+# Seconds before a session whose iteration failed is submitted again
+SESSION_RETRY_DELAY = 5.0
+
+# Sessions that reached their target are closed in SQL before each fetch
+COMPLETE_FINISHED_SESSIONS_SQL = '''
+    UPDATE scraping_sessions
+    SET status = 'complete', completed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+    WHERE status = 'running' AND pages_completed >= total_pages_target
+'''
+
+ACTIVE_SESSIONS_SQL = '''
+    SELECT id AS session_id, project_token, project_name, total_pages_target,
+           pages_completed, current_iteration
+    FROM scraping_sessions
+    WHERE status = 'running' AND pages_completed < total_pages_target
+'''
+
 
 class SessionMonitor:
     """Monitors database for active sessions and executes scraping"""
@@ -20,39 +76,46 @@ class SessionMonitor:
         self.auto_runner = AutoRunnerService()
         self.is_running = True
         self.active_sessions = set()
+        self.wakeup = threading.Event()
+        self._urls_mtime = None
+        self.pool = ThreadPoolExecutor(max_workers=MAX_SESSION_WORKERS, thread_name_prefix='sess')
+        self.inflight = set()
+        self.inflight_lock = threading.Lock()
+        self.retry_after = {}
+        # Session URLs read from the log; only lines appended since the last
+        # read are parsed, and a compacted (replaced) file is read afresh
+        self._urls_cache = None
+        self._urls_cache_mtime = None
+        self._urls_cache_ino = None
+        self._urls_cache_offset = 0
+        self._urls_cache_lock = threading.Lock()
+        self._control_socket = None
 
     def get_active_sessions(self):
-        """Get all active scraping sessions from database"""
+        """
+        Yield active scraping sessions from the database as sqlite3.Row
+        objects, read by column name (session_id, project_token, ...)
+        """
         try:
+            # The database keeps this thread's connection open between ticks
             conn = self.session_service.db.connect()
             cursor = conn.cursor()
 
-            cursor.execute('''
-                SELECT id, project_token, project_name, total_pages_target,
-                       pages_completed, current_iteration
-                FROM scraping_sessions
-                WHERE status = 'running'
-            ''')
-
-            sessions = []
-            for row in cursor.fetchall():
-                sessions.append({
-                    'session_id': row[0],
-                    'project_token': row[1],
-                    'project_name': row[2],
-                    'total_pages_target': row[3],
-                    'pages_completed': row[4],
-                    'current_iteration': row[5]
-                })
-
-            conn.close()
-            return sessions
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch active sessions: {str(e)}", file=sys.stderr)
-            return []
+            cursor.execute(COMPLETE_FINISHED_SESSIONS_SQL)
+            if cursor.rowcount:
+                logger.info("[OK] Marked %d finished session(s) complete", cursor.rowcount)
+            conn.commit()
+
+            yield from cursor.execute(ACTIVE_SESSIONS_SQL)
+        except sqlite3.OperationalError as e:
+            # The connection already waits out locks (busy_timeout); this is a
+            # lock held past that, so skip the tick. Other errors propagate
+            logger.error("[ERROR] Failed to fetch active sessions: %s", e)
+        finally:
+            self.session_service.db.disconnect()
 
     def process_session(self, session):
-        """Process a single scraping session"""
+        """Process a single scraping session; True if the iteration succeeded"""
         try:
             session_id = session['session_id']
             project_token = session['project_token']
@@ -61,37 +124,27 @@ class SessionMonitor:
             pages_completed = session['pages_completed']
             current_iteration = session['current_iteration'] or 1
 
-            print(f"[PROCESS] Starting iteration {current_iteration} for session {session_id}", 
-                  file=sys.stderr)
-
-            # Check if session is complete
-            if pages_completed >= total_pages:
-                print(f"[OK] Session {session_id} is complete! ({pages_completed}/{total_pages} pages)", 
-                      file=sys.stderr)
-                self.session_service.mark_session_complete(session_id)
-                return
+            logger.info("[PROCESS] Starting iteration %s for session %s", current_iteration, session_id)
 
             # Get original URL
             original_url = self._get_original_url(session_id)
             
             if not original_url:
-                print(f"[ERROR] No original URL found for session {session_id}. Cannot proceed.", 
-                      file=sys.stderr)
-                print(f"[DEBUG] Will retry in next cycle...", file=sys.stderr)
+                logger.error("[ERROR] No original URL found for session %s. Cannot proceed.", session_id)
+                logger.debug("[DEBUG] Will retry in next cycle...")
                 return
 
-            print(f"[PROCESS] Using URL: {original_url}", file=sys.stderr)
+            logger.info("[PROCESS] Using URL: %s", original_url)
 
             # Calculate iteration parameters
             pages_per_iteration = 10  # Default - you can make this configurable
             start_page = pages_completed + 1
             end_page = min(start_page + pages_per_iteration - 1, total_pages)
 
-            print(f"[PROCESS] Iteration {current_iteration}: pages {start_page}-{end_page}", 
-                  file=sys.stderr)
+            logger.info("[PROCESS] Iteration %s: pages %s-%s", current_iteration, start_page, end_page)
 
             # Execute iteration
-            print(f"[EXECUTE] Calling auto_runner.execute_iteration()...", file=sys.stderr)
+            logger.debug("[EXECUTE] Calling auto_runner.execute_iteration()...")
             iter_res = self.auto_runner.execute_iteration(
                 session_id, current_iteration, project_token, project_name,
                 start_page, end_page, original_url
@@ -100,127 +153,270 @@ class SessionMonitor:
             if iter_res['success']:
                 # Update session progress
                 new_pages_completed = iter_res['pages_completed']
-                print(f"[SUCCESS] Iteration {current_iteration} completed: {new_pages_completed} pages", 
-                      file=sys.stderr)
+                logger.info("[SUCCESS] Iteration %s completed: %s pages", current_iteration, new_pages_completed)
                 
                 self.session_service.update_session_progress(
                     session_id, new_pages_completed, 'running'
                 )
 
-                print(f"[MONITOR] Session {session_id} progress: {new_pages_completed}/{total_pages} pages",
-                      file=sys.stderr)
+                logger.info("[MONITOR] Session %s progress: %s/%s pages", session_id, new_pages_completed, total_pages)
 
                 # If more iterations needed, the next monitor loop will handle it
                 if new_pages_completed >= total_pages:
-                    print(f"[COMPLETE] All pages scraped for session {session_id}!", file=sys.stderr)
+                    logger.info("[COMPLETE] All pages scraped for session %s!", session_id)
                     self.session_service.mark_session_complete(session_id)
+                return True
             else:
-                print(f"[ERROR] Iteration {current_iteration} failed: {iter_res.get('error')}", 
-                      file=sys.stderr)
-                print(f"[RETRY] Will retry iteration {current_iteration} in next cycle", file=sys.stderr)
-
-        except Exception as e:
-            print(f"[ERROR] Exception in process_session: {str(e)}", file=sys.stderr)
-            import traceback
-            print(traceback.format_exc(), file=sys.stderr)
+                logger.error("[ERROR] Iteration %s failed: %s", current_iteration, iter_res.get('error'))
+                logger.info("[RETRY] Will retry iteration %s in next cycle", current_iteration)
+
+        except Exception:
+            logger.exception("[ERROR] Exception in process_session")
+        return False
+
+    def _submit_session(self, session):
+        """Queue a session on the worker pool unless it is already being processed"""
+        session_id = session['session_id']
+        with self.inflight_lock:
+            if session_id in self.inflight:
+                return False
+            if time.monotonic() < self.retry_after.get(session_id, 0):
+                return False
+            self.inflight.add(session_id)
+
+        future = self.pool.submit(self.process_session, session)
+        future.add_done_callback(lambda f: self._session_done(session_id, f))
+        return True
+
+    def _session_done(self, session_id, future):
+        """
+        Release a finished session. A successful iteration wakes the loop to
+        schedule the next one; a failed one is held back for SESSION_RETRY_DELAY
+        so a session that fails fast isn't resubmitted in a tight loop
+        """
+        succeeded = not future.cancelled() and future.exception() is None and future.result()
+        with self.inflight_lock:
+            self.inflight.discard(session_id)
+            if succeeded:
+                self.retry_after.pop(session_id, None)
+            else:
+                self.retry_after[session_id] = time.monotonic() + SESSION_RETRY_DELAY
+
+        if succeeded:
+            self.wakeup.set()
+        elif self.is_running:
+            timer = threading.Timer(SESSION_RETRY_DELAY, self.wakeup.set)
+            timer.daemon = True
+            timer.start()
+
+    def _load_legacy_session_urls(self):
+        """Session URLs from the old whole-file JSON store, if it is still around"""
+        if not os.path.exists(LEGACY_SESSION_URLS_FILE):
+            return {}
+        with open(LEGACY_SESSION_URLS_FILE, 'r') as f:
+            return {key: entry['url'] for key, entry in json.load(f).items()}
+
+    def _refresh_session_urls(self, stat):
+        """Bring the URL cache up to date with the log; caller holds the lock"""
+        if self._urls_cache is None or stat.st_ino != self._urls_cache_ino \
+                or stat.st_size < self._urls_cache_offset:
+            self._urls_cache = self._load_legacy_session_urls()
+            self._urls_cache_ino = stat.st_ino
+            self._urls_cache_offset = 0
+
+        with open(SESSION_URLS_FILE, 'rb') as f:
+            f.seek(self._urls_cache_offset)
+            chunk = f.read()
+
+        # A line still being appended has no newline yet; leave it for next time
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self._urls_cache[str(entry['id'])] = entry['url']
+        self._urls_cache_offset += len(complete)
+        self._urls_cache_mtime = stat.st_mtime_ns
 
     def _get_original_url(self, session_id):
-        """Get original URL from session_urls.json file (no database locks!)"""
+        """Get original URL from the session URLs log (no database locks!)"""
         try:
-            import os
-            
-            session_urls_file = os.path.join(
-                os.path.dirname(__file__), '..',
-                'session_urls.json'
-            )
+            logger.debug("[DEBUG] Looking for session URL in: %s", SESSION_URLS_FILE)
             
-            print(f"[DEBUG] Looking for session URL in: {session_urls_file}", file=sys.stderr)
-            
-            if not os.path.exists(session_urls_file):
-                print(f"[DEBUG] Session URLs file not found", file=sys.stderr)
-                return None
-            
-            with open(session_urls_file, 'r') as f:
-                sessions = json.load(f)
+            with self._urls_cache_lock:
+                try:
+                    stat = os.stat(SESSION_URLS_FILE)
+                except OSError:
+                    stat = None
+
+                if stat is None:
+                    if self._urls_cache is None:
+                        self._urls_cache = self._load_legacy_session_urls()
+                elif stat.st_mtime_ns != self._urls_cache_mtime or stat.st_ino != self._urls_cache_ino:
+                    self._refresh_session_urls(stat)
+                sessions = self._urls_cache
             
             session_key = str(session_id)
             if session_key in sessions:
-                url = sessions[session_key]['url']
-                print(f"[OK] Retrieved URL from file: {url}", file=sys.stderr)
+                url = sessions[session_key]
+                logger.debug("[OK] Retrieved URL from file: %s", url)
                 return url
             else:
-                print(f"[DEBUG] No URL found for session {session_id}", file=sys.stderr)
+                logger.debug("[DEBUG] No URL found for session %s", session_id)
                 return None
                 
-        except Exception as e:
-            print(f"[ERROR] Failed to get original URL: {str(e)}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+        except Exception:
+            logger.exception("[ERROR] Failed to get original URL")
+            return None
+
+    def _session_urls_mtime(self):
+        """Modification time of the session URLs file, or None if missing"""
+        try:
+            return os.stat(SESSION_URLS_FILE).st_mtime_ns
+        except OSError:
             return None
 
+    def _wait_for_work(self, timeout):
+        """
+        Sleep up to timeout seconds, returning early when the monitor is woken
+        (a control-socket notification or a retry timer) or another process
+        saves a new session URL
+        """
+        deadline = time.monotonic() + timeout
+        while self.is_running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.wakeup.wait(timeout=min(remaining, MIN_POLL_INTERVAL)):
+                break
+            # A stat() is far cheaper than querying the database each second
+            if self._session_urls_mtime() != self._urls_mtime:
+                break
+        self.wakeup.clear()
+
+    def _open_control_channel(self):
+        """Write the PID file and start listening for new-session notifications"""
+        with open(MONITOR_PID_FILE, 'w') as f:
+            f.write(str(os.getpid()))
+
+        if not USE_CONTROL_SOCKET:
+            return
+        try:
+            if os.path.exists(MONITOR_SOCKET_PATH):
+                os.unlink(MONITOR_SOCKET_PATH)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(MONITOR_SOCKET_PATH)
+        except OSError as e:
+            logger.warning("[WARNING] Control socket unavailable, polling only: %s", e)
+            return
+
+        self._control_socket = sock
+        threading.Thread(target=self._listen_for_sessions, args=(sock,), daemon=True).start()
+
+    def _listen_for_sessions(self, sock):
+        """Wake the loop for every datagram received until the socket is closed"""
+        while True:
+            try:
+                message = sock.recv(1024)
+            except OSError:
+                return
+            logger.debug("[MONITOR] Notification received: %s", message)
+            self.wakeup.set()
+
+    def _close_control_channel(self):
+        """Stop listening and remove the PID file and socket"""
+        if self._control_socket is not None:
+            # shutdown() unblocks the listener's recv() before the close
+            try:
+                self._control_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._control_socket.close()
+            self._control_socket = None
+            try:
+                os.unlink(MONITOR_SOCKET_PATH)
+            except OSError:
+                pass
+        try:
+            with open(MONITOR_PID_FILE) as f:
+                owned = f.read().strip() == str(os.getpid())
+            if owned:
+                os.unlink(MONITOR_PID_FILE)
+        except OSError:
+            pass
+
     def monitor_loop(self):
         """Main monitoring loop - runs continuously"""
-        print("[OK] Session monitor started!", file=sys.stderr)
+        logger.info("[OK] Session monitor started!")
+        self._open_control_channel()
         loop_count = 0
+        poll_interval = MIN_POLL_INTERVAL
 
         while self.is_running:
             try:
                 loop_count += 1
-                print(f"[MONITOR] Loop #{loop_count} - Checking for active sessions...", file=sys.stderr)
-
-                # Get all active sessions
-                sessions = self.get_active_sessions()
-
-                if sessions:
-                    print(f"[MONITOR] Found {len(sessions)} active session(s)", file=sys.stderr)
-
-                    for session in sessions:
-                        session_id = session['session_id']
-                        pages_completed = session['pages_completed']
-                        total_pages = session['total_pages_target']
-                        
-                        print(f"[MONITOR] Session {session_id}: {pages_completed}/{total_pages} pages", 
-                              file=sys.stderr)
-
-                        # Check if complete
-                        if pages_completed >= total_pages:
-                            print(f"[OK] Session {session_id} is complete!", file=sys.stderr)
-                            self.session_service.mark_session_complete(session_id)
-                            continue
-
-                        # Try to process
-                        try:
-                            self.process_session(session)
-                        except Exception as e:
-                            print(f"[ERROR] Failed to process session {session_id}: {str(e)}", 
-                                  file=sys.stderr)
-
-                        # Give a moment between sessions
-                        time.sleep(2)
+                logger.debug("[MONITOR] Loop #%d - Checking for active sessions...", loop_count)
+
+                # Taken before the query so a session saved after it still wakes the wait
+                self._urls_mtime = self._session_urls_mtime()
+
+                # Submit active sessions as the rows are read
+                found = submitted = 0
+                for session in self.get_active_sessions():
+                    found += 1
+                    session_id = session['session_id']
+                    pages_completed = session['pages_completed']
+                    total_pages = session['total_pages_target']
+                    
+                    logger.debug("[MONITOR] Session %s: %s/%s pages", session_id, pages_completed, total_pages)
+
+                    # Process on the worker pool; a finishing session wakes the loop
+                    try:
+                        if self._submit_session(session):
+                            submitted += 1
+                        else:
+                            logger.debug("[MONITOR] Session %s still in progress", session_id)
+                    except Exception as e:
+                        logger.error("[ERROR] Failed to process session %s: %s", session_id, e)
+
+                if found:
+                    logger.debug("[MONITOR] Found %d active session(s)", found)
                 else:
-                    print(f"[MONITOR] No active sessions found", file=sys.stderr)
+                    logger.debug("[MONITOR] No active sessions found")
 
-                # Sleep before next check - reduced from 10 to 5 seconds for faster response
-                print(f"[MONITOR] Sleeping 5 seconds before next check...", file=sys.stderr)
-                time.sleep(5)
+                logger.debug("[MONITOR] Waiting up to %.0fs before next check...", poll_interval)
+                self._wait_for_work(poll_interval)
 
-            except Exception as e:
-                print(f"[ERROR] Monitor loop error: {str(e)}", file=sys.stderr)
-                import traceback
-                print(traceback.format_exc(), file=sys.stderr)
+                if submitted:
+                    poll_interval = MIN_POLL_INTERVAL
+                else:
+                    poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL)
+
+            except Exception:
+                logger.exception("[ERROR] Monitor loop error")
                 time.sleep(5)  # Wait before retrying
 
+        self._close_control_channel()
+
+        # Running iterations may take up to an hour; don't block shutdown on them
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+        # The loop thread owns its persistent connection; release it on exit
+        self.session_service.db.close()
+
     def start(self):
         """Start the monitor in a background thread (for compatibility)"""
         thread = threading.Thread(target=self.monitor_loop, daemon=False)
         thread.start()
-        print("[OK] Background monitor thread started (non-daemon)", file=sys.stderr)
+        logger.info("[OK] Background monitor thread started (non-daemon)")
         return thread
 
     def stop(self):
         """Stop the monitor"""
         self.is_running = False
-        print("[OK] Monitor stopped", file=sys.stderr)
+        self.wakeup.set()
+        logger.info("[OK] Monitor stopped")
+        for handler in logger.handlers:
+            handler.flush()
 
 
 # Global monitor instance
@@ -236,6 +432,55 @@ def start_session_monitor():
     return _monitor
 
 
+def _pid_alive(pid):
+    """Check whether a process exists without signalling it"""
+    if os.name == 'nt':
+        # os.kill(pid, 0) terminates the process on Windows, so ask the kernel
+        import ctypes
+        SYNCHRONIZE, WAIT_TIMEOUT = 0x00100000, 0x00000102
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == WAIT_TIMEOUT
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_monitor_alive():
+    """True if the PID file names a monitor process that is still running"""
+    try:
+        with open(MONITOR_PID_FILE) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return False
+    return _pid_alive(pid)
+
+
+def send_session_notification(session_id):
+    """
+    Tell a monitor in another process about a new session so it wakes at once.
+    Returns False when there is no socket to send to; the monitor still picks
+    the session up from the session URLs file within a second
+    """
+    if not USE_CONTROL_SOCKET:
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(json.dumps({'session_id': session_id}).encode(), MONITOR_SOCKET_PATH)
+        return True
+    except OSError:
+        return False
+
+
 def get_session_monitor():
     """Get the global session monitor"""
     global _monitor
@@ -10,32 +10,88 @@ import json
 import os
 import subprocess
 import time
+from contextlib import contextmanager
 from scraping_session_service import ScrapingSessionService
-
-# Session URL storage file (avoids database locks)
-SESSION_URLS_FILE = os.path.join(os.path.dirname(__file__), '..', 'session_urls.json')
+from session_monitor import (
+    SESSION_URLS_FILE, SESSION_URLS_COMPACT_BYTES, MONITOR_PID_FILE,
+    is_monitor_alive, send_session_notification
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How long start_background_monitor waits for the new monitor to report in
+MONITOR_READY_TIMEOUT = 3.0
+
+# Serializes appends and compaction across concurrent starter processes
+SESSION_URLS_LOCK_FILE = SESSION_URLS_FILE + '.lock'
+
+
+@contextmanager
+def session_urls_lock():
+    """Hold an exclusive lock on the session URL log while appending or compacting"""
+    os.makedirs(os.path.dirname(SESSION_URLS_LOCK_FILE), exist_ok=True)
+    with open(SESSION_URLS_LOCK_FILE, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            # Blocks, retrying for about 10s before raising OSError
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def compact_session_urls():
+    """
+    Rewrite the session URL log keeping only the latest line per session.
+    Call with session_urls_lock held so no append lands between the read
+    and the replace
+    """
+    latest = {}
+    with open(SESSION_URLS_FILE, 'rb') as f:
+        for line in f:
+            if line.endswith(b'\n') and line.strip():
+                entry = json.loads(line)
+                latest[entry['id']] = line
+
+    # Replace atomically so the monitor never sees a half-written log
+    temp_file = f'{SESSION_URLS_FILE}.{os.getpid()}.tmp'
+    with open(temp_file, 'wb') as f:
+        f.writelines(latest.values())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, SESSION_URLS_FILE)
 
 
 def save_session_url(session_id: int, original_url: str):
-    """Save session URL to JSON file (bypasses database locks)"""
+    """Append session URL to the JSONL log (bypasses database locks)"""
     try:
-        # Load existing sessions
-        if os.path.exists(SESSION_URLS_FILE):
-            with open(SESSION_URLS_FILE, 'r') as f:
-                sessions = json.load(f)
-        else:
-            sessions = {}
-        
-        # Add/update this session
-        sessions[str(session_id)] = {
+        entry = {
+            'id': session_id,
             'url': original_url,
-            'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            'ts': time.strftime('%Y-%m-%d %H:%M:%S')
         }
-        
-        # Save back
-        os.makedirs(os.path.dirname(SESSION_URLS_FILE), exist_ok=True)
-        with open(SESSION_URLS_FILE, 'w') as f:
-            json.dump(sessions, f, indent=2)
+
+        # One append per session: no read-modify-write of the whole store
+        with session_urls_lock():
+            with open(SESSION_URLS_FILE, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+
+            if size > SESSION_URLS_COMPACT_BYTES:
+                compact_session_urls()
         
         print(f"[OK] Saved session {session_id} URL to file", file=sys.stderr)
         return True
@@ -45,21 +101,27 @@ def save_session_url(session_id: int, original_url: str):
 
 
 def is_monitor_running():
-    """Check if background monitor process is already running"""
+    """Check if background monitor process is already running (via its PID file)"""
     try:
-        # Try to connect to database and ping it
-        from scraping_session_service import ScrapingSessionService
-        service = ScrapingSessionService()
-        conn = service.db.connect()
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        conn.close()
-        # Monitor is likely running if DB is accessible
-        return True
-    except:
+        return is_monitor_alive()
+    except Exception:
         return False
 
 
+def wait_for_monitor_ready(pid: int, timeout: float = MONITOR_READY_TIMEOUT) -> bool:
+    """Wait until the monitor with this PID has written its PID file"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with open(MONITOR_PID_FILE) as f:
+                if f.read().strip() == str(pid):
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
 def start_background_monitor():
     """Start the background monitor as a separate process"""
     try:
@@ -70,7 +132,7 @@ def start_background_monitor():
         # Use Popen with close_fds to detach from parent process
         if sys.platform == 'win32':
             # Windows: Use CREATE_NEW_PROCESS_GROUP to detach
-            subprocess.Popen(
+            process = subprocess.Popen(
                 [sys.executable, monitor_script],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
@@ -79,7 +141,7 @@ def start_background_monitor():
             )
         else:
             # Unix/Linux: Use preexec_fn to detach
-            subprocess.Popen(
+            process = subprocess.Popen(
                 [sys.executable, monitor_script],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
@@ -87,8 +149,11 @@ def start_background_monitor():
                 close_fds=True
             )
         
-        print(f"[OK] Started background monitor process", file=sys.stderr)
-        time.sleep(1)  # Give it a moment to start
+        # Returns as soon as the monitor has written its PID file
+        if wait_for_monitor_ready(process.pid):
+            print(f"[OK] Started background monitor process", file=sys.stderr)
+        else:
+            print(f"[WARNING] Background monitor not ready after {MONITOR_READY_TIMEOUT:.0f}s", file=sys.stderr)
         return True
     except Exception as e:
         print(f"[WARNING] Could not start background monitor: {str(e)}", file=sys.stderr)
@@ -145,6 +210,7 @@ def main():
             start_background_monitor()
         else:
             print(f"[INFO] Background monitor already running", file=sys.stderr)
+            send_session_notification(session_id)
 
         # Return success with session details immediately
         # The actual scraping will happen in the background
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Test streaming JSON import across chunk boundaries"""
+import io
+import json
+import os
+import tempfile
+from database import ParseHubDatabase, _iter_json_records
+
+# Numbers that decode as a shorter prefix when the buffer ends mid-token
+records = [
+    {'price': 12.5, 'stock': 2.5e3, 'qty': 1234567, 'rank': -0.75},
+    {'price': 100, 'stock': 1e-2, 'qty': 0, 'rank': 3.14159},
+    {'name': 'plain', 'nested': {'n': 42.0}, 'list': [1, 22, 333]},
+]
+text = json.dumps({'products': records})
+
+print('[TEST] Starting JSON stream test...')
+
+# Every chunk size splits some number at a different offset
+for chunk_size in range(1, 48):
+    parsed = list(_iter_json_records(io.StringIO(text), chunk_size=chunk_size))
+    assert parsed == records, f'chunk_size={chunk_size}: {parsed}'
+print('[TEST] Numbers split at chunk edges parse intact')
+
+# Numbers in a skipped array before the records must not break the scan
+skipped = json.dumps({'ids': [2.5e10, 12.75, -3], 'products': records})
+for chunk_size in range(1, 48):
+    parsed = list(_iter_json_records(io.StringIO(skipped), chunk_size=chunk_size))
+    assert parsed == records, f'chunk_size={chunk_size}: {parsed}'
+print('[TEST] Skipped number arrays parse intact')
+
+with tempfile.TemporaryDirectory() as tmp:
+    db = ParseHubDatabase(os.path.join(tmp, 'stream.db'))
+    db.add_project('stream_token', 'Stream test')
+    conn = db.connect()
+    project_id = conn.execute('SELECT id FROM projects WHERE token = ?', ('stream_token',)).fetchone()['id']
+    db.disconnect()
+
+    # A parse failure must not leave a run behind to block a retry
+    bad_file = os.path.join(tmp, 'bad.json')
+    with open(bad_file, 'w', encoding='utf-8') as f:
+        f.write('[{"price": 1}, {"price": ')
+    try:
+        db._stream_import_json(bad_file, project_id, 'stream_token',
+                               'run_1', 'complete', 1, '2024-01-01T00:00:00')
+        raise AssertionError('truncated file imported')
+    except json.JSONDecodeError:
+        pass
+    conn = db.connect()
+    orphan = conn.execute('SELECT id FROM runs WHERE run_token = ?', ('run_1',)).fetchone()
+    db.disconnect()
+    assert orphan is None, 'orphan run left after failed import'
+    print('[TEST] Failed import leaves no run row')
+
+    good_file = os.path.join(tmp, 'good.json')
+    with open(good_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    result = db._stream_import_json(good_file, project_id, 'stream_token',
+                                    'run_1', 'complete', 1, '2024-01-01T00:00:00')
+    assert result and result['records'] == len(records), result
+    print(f'[TEST] Retry with the same run token: {result}')
+
+    db.close()
+
+print('[TEST] JSON stream test complete - SUCCESS')
@@ -5,14 +5,15 @@ Handles URL pattern detection and next page URL generation
 
 import re
 import sys
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 
 class URLGenerator:
     """Generate next page URLs from original URLs"""
 
-    # Common pagination patterns
-    PATTERNS = {
+    # Common pagination patterns, compiled once at class definition
+    PATTERNS = {name: re.compile(regex) for name, regex in {
         'query_page': r'[?&]page=(\d+)',
         'query_p': r'[?&]p=(\d+)',
         'query_offset': r'[?&]offset=(\d+)',
@@ -21,30 +22,48 @@ class URLGenerator:
         'path_p': r'/p/(\d+)',
         'path_products': r'/products/page[/-](\d+)',
         'query_custom': r'[?&](\w+)=(\d+)',  # Generic catch-all
+    }.items()}
+
+    # Patterns used to rewrite the page number in generate_next_url
+    SUB_PATTERNS = {
+        'query_page': re.compile(r'([?&]page=)\d+'),
+        'query_p': re.compile(r'([?&]p=)\d+'),
+        'query_offset': re.compile(r'([?&]offset=)\d+'),
+        'query_start': re.compile(r'([?&]start=)\d+'),
+        'path_page': re.compile(r'/page[/-]\d+'),
+        'path_p': re.compile(r'/p/\d+'),
+        'path_products': re.compile(r'/products/page[/-]\d+'),
     }
 
     @staticmethod
-    def detect_pattern(url: str):
-        """Detect pagination pattern in URL"""
+    @lru_cache(maxsize=1024)
+    def _match_pattern(url: str):
+        """
+        Scan URL against PATTERNS; memoized because a session passes the same
+        base URL on every iteration. Returns an immutable tuple so cached
+        results can't be altered by callers
+        """
         url_lower = url.lower()
 
         # Check each pattern
-        for pattern_name, pattern_regex in URLGenerator.PATTERNS.items():
-            match = re.search(pattern_regex, url_lower)
+        for pattern_name, pattern in URLGenerator.PATTERNS.items():
+            match = pattern.search(url_lower)
             if match:
-                return {
-                    'pattern_type': pattern_name,
-                    'pattern_regex': pattern_regex,
-                    'current_page': int(match.group(1)) if match.lastindex >= 1 else 1,
-                    'match_groups': match.groups()
-                }
+                current_page = int(match.group(1)) if match.lastindex >= 1 else 1
+                return pattern_name, pattern.pattern, current_page, match.groups()
 
         # No pattern found
+        return 'unknown', None, 1, ()
+
+    @staticmethod
+    def detect_pattern(url: str):
+        """Detect pagination pattern in URL"""
+        pattern_type, pattern_regex, current_page, match_groups = URLGenerator._match_pattern(url)
         return {
-            'pattern_type': 'unknown',
-            'pattern_regex': None,
-            'current_page': 1,
-            'match_groups': []
+            'pattern_type': pattern_type,
+            'pattern_regex': pattern_regex,
+            'current_page': current_page,
+            'match_groups': match_groups if pattern_regex else []
         }
 
     @staticmethod
@@ -57,53 +76,8 @@ class URLGenerator:
         pattern_type = pattern_info.get('pattern_type')
 
         try:
-            # Query parameter patterns
-            if 'query_page' in pattern_type or pattern_type == 'query_page':
-                return re.sub(r'([?&]page=)\d+', rf'\g<1>{next_page_number}', url)
-
-            elif 'query_p' in pattern_type or pattern_type == 'query_p':
-                return re.sub(r'([?&]p=)\d+', rf'\g<1>{next_page_number}', url)
-
-            elif 'query_offset' in pattern_type or pattern_type == 'query_offset':
-                # For offset-based, we might need to calculate offset
-                # Assuming each page has items_per_page (default 10 or 20)
-                offset = (next_page_number - 1) * 20
-                return re.sub(r'([?&]offset=)\d+', rf'\g<1>{offset}', url)
-
-            elif 'query_start' in pattern_type or pattern_type == 'query_start':
-                start = (next_page_number - 1) * 20
-                return re.sub(r'([?&]start=)\d+', rf'\g<1>{start}', url)
-
-            # Path-based patterns
-            elif 'path_page' in pattern_type or pattern_type == 'path_page':
-                return re.sub(r'/page[/-]\d+', f'/page-{next_page_number}', url)
-
-            elif 'path_p' in pattern_type or pattern_type == 'path_p':
-                return re.sub(r'/p/\d+', f'/p/{next_page_number}', url)
-
-            elif 'path_products' in pattern_type or pattern_type == 'path_products':
-                return re.sub(r'/products/page[/-]\d+', f'/products/page-{next_page_number}', url)
-
-            elif pattern_type == 'query_custom':
-                # Generic query parameter replacement
-                if pattern_info.get('match_groups'):
-                    param_name = pattern_info['match_groups'][0]
-                    return re.sub(rf'([?&]{param_name}=)\d+', rf'\g<1>{next_page_number}', url)
-
-            else:
-                # Unknown pattern - try best guess
-                # Try common patterns as fallback
-                result = re.sub(r'([?&]page=)\d+', rf'\g<1>{next_page_number}', url)
-                if result != url:
-                    return result
-
-                result = re.sub(r'([?&]p=)\d+', rf'\g<1>{next_page_number}', url)
-                if result != url:
-                    return result
-
-                # If no substitution worked, append as query parameter
-                separator = '&' if '?' in url else '?'
-                return f"{url}{separator}page={next_page_number}"
+            handler = _HANDLERS.get(pattern_type, _gen_unknown)
+            return handler(url, next_page_number, pattern_info)
 
         except Exception as e:
             print(f"[WARNING] Error generating next URL: {str(e)}", file=sys.stderr)
@@ -111,8 +85,6 @@ class URLGenerator:
             separator = '&' if '?' in url else '?'
             return f"{url}{separator}page={next_page_number}"
 
-        return url
-
     @staticmethod
     def extract_page_number(url: str):
         """Extract current page number from URL"""
@@ -133,3 +105,74 @@ class URLGenerator:
         """Get base URL without query parameters"""
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+
+# Next-URL builders for generate_next_url, one per pattern type; each takes
+# (url, next_page_number, pattern_info) and returns the rewritten URL
+
+def _gen_query_page(url, next_page_number, pattern_info):
+    return URLGenerator.SUB_PATTERNS['query_page'].sub(rf'\g<1>{next_page_number}', url)
+
+
+def _gen_query_p(url, next_page_number, pattern_info):
+    return URLGenerator.SUB_PATTERNS['query_p'].sub(rf'\g<1>{next_page_number}', url)
+
+
+def _gen_query_offset(url, next_page_number, pattern_info):
+    # For offset-based, we might need to calculate offset
+    # Assuming each page has items_per_page (default 10 or 20)
+    offset = (next_page_number - 1) * 20
+    return URLGenerator.SUB_PATTERNS['query_offset'].sub(rf'\g<1>{offset}', url)
+
+
+def _gen_query_start(url, next_page_number, pattern_info):
+    start = (next_page_number - 1) * 20
+    return URLGenerator.SUB_PATTERNS['query_start'].sub(rf'\g<1>{start}', url)
+
+
+def _gen_path_page(url, next_page_number, pattern_info):
+    return URLGenerator.SUB_PATTERNS['path_page'].sub(f'/page-{next_page_number}', url)
+
+
+def _gen_path_p(url, next_page_number, pattern_info):
+    return URLGenerator.SUB_PATTERNS['path_p'].sub(f'/p/{next_page_number}', url)
+
+
+def _gen_path_products(url, next_page_number, pattern_info):
+    return URLGenerator.SUB_PATTERNS['path_products'].sub(f'/products/page-{next_page_number}', url)
+
+
+def _gen_query_custom(url, next_page_number, pattern_info):
+    # Generic query parameter replacement
+    if pattern_info.get('match_groups'):
+        param_name = pattern_info['match_groups'][0]
+        return re.sub(rf'([?&]{param_name}=)\d+', rf'\g<1>{next_page_number}', url)
+    return url
+
+
+def _gen_unknown(url, next_page_number, pattern_info):
+    # Unknown pattern - try best guess
+    # Try common patterns as fallback
+    result = _gen_query_page(url, next_page_number, pattern_info)
+    if result != url:
+        return result
+
+    result = _gen_query_p(url, next_page_number, pattern_info)
+    if result != url:
+        return result
+
+    # If no substitution worked, append as query parameter
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}page={next_page_number}"
+
+
+_HANDLERS = {
+    'query_page': _gen_query_page,
+    'query_p': _gen_query_p,
+    'query_offset': _gen_query_offset,
+    'query_start': _gen_query_start,
+    'path_page': _gen_path_page,
+    'path_p': _gen_path_p,
+    'path_products': _gen_path_products,
+    'query_custom': _gen_query_custom,
+}
@@ -13,6 +13,35 @@ export async function GET(request: NextRequest) {
       )
     }
 
+    // Prefer the long-running backend API (cached, ETag-aware); spawn the
+    // Python script only when the backend is unreachable
+    const backendUrl = process.env.BACKEND_API_URL || 'http://localhost:5000'
+    try {
+      const headers: Record<string, string> = {
+        'Authorization': `Bearer ${process.env.BACKEND_API_KEY}`,
+      }
+      const ifNoneMatch = request.headers.get('if-none-match')
+      if (ifNoneMatch) {
+        headers['If-None-Match'] = ifNoneMatch
+      }
+
+      const response = await fetch(
+        `${backendUrl}/api/sessions/progress?session_id=${encodeURIComponent(sessionId)}`,
+        { method: 'GET', headers, cache: 'no-store' }
+      )
+      const etag = response.headers.get('etag')
+
+      if (response.status === 304) {
+        return new NextResponse(null, { status: 304, headers: etag ? { ETag: etag } : {} })
+      }
+      if (response.ok) {
+        const progress = await response.json()
+        return NextResponse.json(progress, { headers: etag ? { ETag: etag } : {} })
+      }
+    } catch (fetchError) {
+      console.warn('[API] Backend progress endpoint unavailable, falling back to script:', fetchError)
+    }
+
     const projectRoot = path.resolve(process.cwd(), '..')
     const backendPath = path.join(projectRoot, 'backend')
 
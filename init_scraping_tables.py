@@ -9,83 +9,92 @@ Creates:
 
 import sqlite3
 import sys
-import os
 from datetime import datetime
 
-os.chdir('d:\\Parsehub')
+DB_PATH = 'd:\\Parsehub\\parsehub.db'
 
-try:
-    conn = sqlite3.connect('parsehub.db')
-    cursor = conn.cursor()
-    
-    print("[INIT] Creating scraping_sessions table...")
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS scraping_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_token TEXT NOT NULL,
-            project_name TEXT NOT NULL,
-            total_pages_target INTEGER NOT NULL,
-            pages_completed INTEGER DEFAULT 0,
-            current_iteration INTEGER DEFAULT 0,
-            status TEXT DEFAULT 'running',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(project_token, total_pages_target)
-        )
-    ''')
-    print("[OK] scraping_sessions table created")
+
+def main():
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
     
-    print("[INIT] Creating iteration_runs table...")
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS iteration_runs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id INTEGER NOT NULL,
-            iteration_number INTEGER NOT NULL,
-            parsehub_project_name TEXT,
-            parsehub_project_token TEXT,
-            run_token TEXT,
-            start_page_number INTEGER,
-            end_page_number INTEGER,
-            csv_data TEXT,
-            records_count INTEGER DEFAULT 0,
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            completed_at TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES scraping_sessions(id),
-            UNIQUE(session_id, iteration_number)
-        )
-    ''')
-    print("[OK] iteration_runs table created")
+        # WAL is stored in the database file, so every later connection gets it;
+        # synchronous is per-connection and is set again by ParseHubDatabase
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
     
-    print("[INIT] Creating url_patterns table...")
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS url_patterns (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_token TEXT NOT NULL,
-            original_url TEXT NOT NULL,
-            pattern_type TEXT DEFAULT 'unknown',
-            pattern_regex TEXT,
-            last_page_placeholder TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(project_token)
-        )
-    ''')
-    print("[OK] url_patterns table created")
+        # All three tables in one transaction: a single commit instead of one per DDL
+        print("[INIT] Creating scraping_sessions, iteration_runs and url_patterns tables...")
+        cursor.executescript('''
+            BEGIN;
+
+            CREATE TABLE IF NOT EXISTS scraping_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_token TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                total_pages_target INTEGER NOT NULL,
+                pages_completed INTEGER DEFAULT 0,
+                current_iteration INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'running',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(project_token, total_pages_target)
+            );
+
+            CREATE TABLE IF NOT EXISTS iteration_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL,
+                iteration_number INTEGER NOT NULL,
+                parsehub_project_name TEXT,
+                parsehub_project_token TEXT,
+                run_token TEXT,
+                start_page_number INTEGER,
+                end_page_number INTEGER,
+                csv_data TEXT,
+                records_count INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES scraping_sessions(id),
+                UNIQUE(session_id, iteration_number)
+            );
+
+            CREATE TABLE IF NOT EXISTS url_patterns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_token TEXT NOT NULL,
+                original_url TEXT NOT NULL,
+                pattern_type TEXT DEFAULT 'unknown',
+                pattern_regex TEXT,
+                last_page_placeholder TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(project_token)
+            );
+
+            COMMIT;
+        ''')
+        print("[OK] Tables created")
     
-    # Commit the changes
-    conn.commit()
+        # Verify tables were created
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('scraping_sessions', 'iteration_runs', 'url_patterns')")
+        created_tables = [row[0] for row in cursor.fetchall()]
     
-    # Verify tables were created
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('scraping_sessions', 'iteration_runs', 'url_patterns')")
-    created_tables = [row[0] for row in cursor.fetchall()]
+        print(f"\n[SUCCESS] Created {len(created_tables)} table(s):")
+        for table in created_tables:
+            print(f"  ✓ {table}")
     
-    print(f"\n[SUCCESS] Created {len(created_tables)} table(s):")
-    for table in created_tables:
-        print(f"  ✓ {table}")
+        # Refresh planner statistics where they are missing or stale. A plain
+        # ANALYZE on freshly created (empty) tables would record zero-row stats
+        # that mislead the planner once data arrives
+        cursor.execute('PRAGMA optimize')
     
-    conn.close()
-    sys.exit(0)
+        conn.close()
+        sys.exit(0)
     
-except Exception as e:
-    print(f"[ERROR] {e}")
-    sys.exit(1)
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
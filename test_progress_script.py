@@ -1,54 +1,35 @@
 #!/usr/bin/env python3
 """
-Test the get_session_progress.py script directly.
+Test get_session_progress() from backend/get_session_progress.py in-process.
 """
 
-import subprocess
-import json
 import sys
+import os
+import orjson
 
-# Test with session ID 1
-test_input = json.dumps({'session_id': 1})
+# Import the backend module directly instead of spawning it per call
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from get_session_progress import get_session_progress
 
 try:
-    result = subprocess.run(
-        [sys.executable, 'backend/get_session_progress.py'],
-        input=test_input,
-        capture_output=True,
-        text=True,
-        timeout=5
-    )
-    
-    print("[TEST] Running get_session_progress.py with session_id=1")
-    print(f"[INFO] Exit code: {result.returncode}")
-    
-    if result.stdout:
-        print("[OUTPUT] stdout:")
-        try:
-            data = json.loads(result.stdout)
-            print(json.dumps(data, indent=2))
-        except json.JSONDecodeError as e:
-            print(f"  {result.stdout}")
-            print(f"  [ERROR] Failed to parse JSON: {e}")
-    
-    if result.stderr:
-        print("[OUTPUT] stderr:")
-        print(f"  {result.stderr}")
-    
-    if result.returncode == 0 and result.stdout:
-        try:
-            data = json.loads(result.stdout)
-            print("\n[SUCCESS] Script executed successfully and returned valid JSON")
-            print(f"  - Session: {data.get('project_name')} ({data.get('session_id')})")
-            print(f"  - Progress: {data.get('pages_completed')}/{data.get('total_pages_target')} pages ({data.get('percentage')}%)")
-            print(f"  - Status: {data.get('status')}")
-            print(f"  - Iterations: {data.get('iterations_completed')}/{data.get('total_iterations_needed')}")
-        except:
-            pass
+    print("[TEST] Calling get_session_progress with session_id=1")
+    data = get_session_progress(1)
+
+    print("[OUTPUT] result:")
+    # orjson encodes straight to bytes; flush the text layer first to keep order
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.flush()
+
+    if 'error' not in data:
+        print("\n[SUCCESS] get_session_progress returned progress")
+        print(f"  - Session: {data.get('project_name')} ({data.get('session_id')})")
+        print(f"  - Progress: {data.get('pages_completed')}/{data.get('total_pages_target')} pages ({data.get('percentage')}%)")
+        print(f"  - Status: {data.get('status')}")
+        print(f"  - Iterations: {data.get('iterations_completed')}/{data.get('total_iterations_needed')}")
     else:
-        print("\n[ERROR] Script failed or didn't return output")
-    
-except subprocess.TimeoutExpired:
-    print("[ERROR] Script timed out")
+        print(f"\n[ERROR] get_session_progress failed: {data.get('error')}")
+
 except Exception as e:
     print(f"[ERROR] {e}")
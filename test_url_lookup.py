@@ -16,38 +16,42 @@ try:
     conn = service.db.connect()
     cursor = conn.cursor()
 
-    # Step 1: Get project token from session
-    print(f"\n[STEP 1] Getting project token for session {session_id}...")
-    cursor.execute('SELECT project_token FROM scraping_sessions WHERE id = ?', (session_id,))
+    # Session's project token and its URL pattern in one query; the LEFT JOIN
+    # still returns the session row when no pattern exists
+    print(f"\n[STEP 1] Getting project token and URL pattern for session {session_id}...")
+    cursor.execute('''
+        SELECT s.project_token, up.original_url
+        FROM scraping_sessions s
+        LEFT JOIN url_patterns up ON up.project_token = s.project_token
+        WHERE s.id = ?
+    ''', (session_id,))
     result = cursor.fetchone()
     
     if result:
-        project_token = result[0]
+        project_token = result['project_token']
         print(f"  Found: {project_token}")
     else:
         print(f"  ERROR: No session found!")
-        conn.close()
+        service.db.disconnect()
         sys.exit(1)
 
-    # Step 2: Get URL pattern
-    print(f"\n[STEP 2] Getting URL pattern for project token {project_token}...")
-    cursor.execute('''
-        SELECT original_url FROM url_patterns
-        WHERE project_token = ?
-    ''', (project_token,))
-
-    result = cursor.fetchone()
-    if result:
-        original_url = result[0]
+    print(f"\n[STEP 2] URL pattern for project token {project_token}...")
+    if result['original_url'] is not None:
+        original_url = result['original_url']
         print(f"  Found: {original_url}")
     else:
         print(f"  ERROR: No URL pattern found!")
         print(f"  Checking all URL patterns in database:")
-        cursor.execute("SELECT project_token, original_url FROM url_patterns")
-        for row in cursor.fetchall():
-            print(f"    - {row[0]}: {row[1]}")
-
-    conn.close()
+        # Formatted and joined by SQLite; one row back however many patterns exist
+        cursor.execute('''
+            SELECT group_concat(printf('    - %s: %s', project_token, original_url), char(10)) AS listing
+            FROM url_patterns
+        ''')
+        listing = cursor.fetchone()['listing']
+        if listing:
+            print(listing)
+
+    service.db.disconnect()
 
 except Exception as e:
     print(f"\n[ERROR] {str(e)}")